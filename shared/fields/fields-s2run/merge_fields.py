@@ -8,29 +8,262 @@ AI原生字段合并工具 - 基于LNST精益创业统筹中枢
 """
 
 import os
+import sys
 import yaml
 import json
-from typing import Dict, List, Any, Optional, Tuple
+import argparse
+import hashlib
+import pickle
+import tempfile
+from typing import Dict, List, Any, Optional, Tuple, Iterator, Callable, NamedTuple
 from datetime import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
 import logging
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / 'utils'))
+from yaml_io import YAML_BACKEND, FIELDS_DUMP_OPTIONS, load_yaml_file, safe_load, safe_dump
+from schema_validator import compile_field_validator, validate_batch
+from field_index import write_field_index
+from field_pool import FieldPool
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 分析查找表 - 模块级常量，避免逐字段重建
+PRIORITY_SCORES = {'P0': 10, 'P1': 7, 'P2': 5, 'P3': 3}
+RISK_LEVEL_SCORES = {'low': 1, 'medium': 2, 'high': 3}
+
+class FieldMetrics(NamedTuple):
+    """单个字段的分析指标 - 一次遍历提取，供统计、业务分析与风险评估共用"""
+    priority: str
+    ai_collaboration: str
+    startup_phase: Optional[str]
+    value_chain_position: Optional[str]
+    estimated_tokens: float
+    is_mvp_critical: bool
+    quick_launch_compatible: bool
+    is_reusable: bool
+    value_score: int
+    has_mitigation_strategy: bool
+    risk_score: int
+    tags: Tuple[str, ...]
+
+def risk_level(risks: List) -> str:
+    """根据风险条目数量评估风险级别"""
+    if len(risks) > 2:
+        return 'high'
+    elif len(risks) > 0:
+        return 'medium'
+    return 'low'
+
+def extract_field_metrics(field_data: Dict) -> FieldMetrics:
+    """单次遍历字段数据，提取全部统计与分析指标"""
+    priority = field_data.get('priority', 'P3')
+    mvp_relevance = field_data.get('mvp_relevance') or {}
+    is_mvp_critical = bool(mvp_relevance.get('is_mvp_critical', False))
+    quick_launch_compatible = bool(mvp_relevance.get('quick_launch_compatible', False))
+    
+    # Token预算
+    estimated_tokens = 0
+    token_budget = field_data.get('token_budget')
+    if isinstance(token_budget, dict):
+        tokens = token_budget.get('estimated_tokens', 0)
+        if isinstance(tokens, (int, float)):
+            estimated_tokens = tokens
+    
+    # 商业价值评分：优先级基础分 + MVP关键性 + 快速启动兼容性
+    value_score = PRIORITY_SCORES.get(priority, 3)
+    if is_mvp_critical:
+        value_score += 5
+    if quick_launch_compatible:
+        value_score += 3
+    
+    # 风险评估：技术、市场、执行三类风险
+    risk_score = 3 * RISK_LEVEL_SCORES['low']
+    has_mitigation_strategy = False
+    risk_mitigation = field_data.get('risk_mitigation')
+    if risk_mitigation is not None:
+        risk_score = sum(RISK_LEVEL_SCORES[risk_level(risk_mitigation.get(key, []))]
+                         for key in ('technical_risks', 'market_risks', 'execution_risks'))
+        has_mitigation_strategy = 'mitigation_strategy' in risk_mitigation
+    
+    tags = field_data.get('tags')
+    
+    return FieldMetrics(
+        priority=priority,
+        ai_collaboration=field_data.get('ai_collaboration', 'L1'),
+        startup_phase=field_data.get('startup_phase'),
+        value_chain_position=field_data.get('value_chain_position'),
+        estimated_tokens=estimated_tokens,
+        is_mvp_critical=is_mvp_critical,
+        quick_launch_compatible=quick_launch_compatible,
+        is_reusable=bool((field_data.get('template_reusability') or {}).get('is_reusable', False)),
+        value_score=min(value_score, 10),
+        has_mitigation_strategy=has_mitigation_strategy,
+        risk_score=risk_score,
+        tags=tuple(tag for tag in tags if isinstance(tag, str)) if isinstance(tags, list) else ()
+    )
+
+def add_counts(target: Dict, source: Dict):
+    """递归累加嵌套计数字典"""
+    for key, value in source.items():
+        if isinstance(value, dict):
+            add_counts(target.setdefault(key, {}), value)
+        else:
+            target[key] = target.get(key, 0) + value
+
+class FieldAnalytics:
+    """字段分析累加器 - 汇总最终胜出字段的指标
+    
+    各累加器可独立（如按文件分片并行）累加后通过 merge 合并，
+    列表类结果按累加/合并顺序排列。
+    """
+    
+    def __init__(self, stats: Dict, business_analysis: Dict):
+        self.stats = stats
+        self.business_analysis = business_analysis
+    
+    def add(self, field_name: str, metrics: FieldMetrics):
+        """累加单个字段的指标"""
+        stats = self.stats
+        stats['total_fields'] += 1
+        
+        if metrics.priority in stats['by_priority']:
+            stats['by_priority'][metrics.priority] += 1
+        if metrics.ai_collaboration in stats['by_ai_level']:
+            stats['by_ai_level'][metrics.ai_collaboration] += 1
+        if metrics.startup_phase in stats['by_startup_phase']:
+            stats['by_startup_phase'][metrics.startup_phase] += 1
+        if metrics.value_chain_position in stats['by_value_chain']:
+            stats['by_value_chain'][metrics.value_chain_position] += 1
+        
+        stats['token_budget_total'] += metrics.estimated_tokens
+        
+        if metrics.is_mvp_critical:
+            stats['mvp_critical_fields'] += 1
+            self.business_analysis['mvp_critical_path'].append(field_name)
+        if metrics.quick_launch_compatible:
+            stats['quick_launch_compatible'] += 1
+        if metrics.is_reusable:
+            stats['reusable_templates'] += 1
+        
+        # 高价值字段识别
+        if metrics.value_score >= 8:
+            stats['business_impact_high'] += 1
+            self.business_analysis['high_value_fields'].append(field_name)
+        
+        # 风险缓解覆盖与高风险字段识别
+        if metrics.has_mitigation_strategy:
+            stats['risk_mitigation_covered'] += 1
+        if metrics.risk_score >= 7:
+            self.business_analysis['risk_areas'].append(field_name)
+    
+    def merge(self, other: 'FieldAnalytics'):
+        """合并另一个累加器的结果"""
+        add_counts(self.stats, other.stats)
+        for key, values in other.business_analysis.items():
+            self.business_analysis[key].extend(values)
+
+class MergeCache:
+    """增量合并缓存 - 以文件路径 + 内容哈希为键，保存每个文件的已验证字段与统计贡献
+    
+    先比较 mtime+size 快速命中；不一致时再计算内容哈希，内容未变则仍然命中。
+    Schema 文件或缓存格式变化时整体失效。
+    """
+    
+    CACHE_VERSION = 3
+    
+    def __init__(self, cache_file: Path, schema_file: Path = None):
+        self.cache_file = cache_file
+        self.fingerprint = (self.CACHE_VERSION, self.hash_file(schema_file) if schema_file and schema_file.exists() else None)
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+    
+    @staticmethod
+    def hash_file(file_path: Path) -> str:
+        """计算文件内容的SHA-256哈希"""
+        with open(file_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    
+    def load(self):
+        """从磁盘加载缓存，格式或指纹不匹配时丢弃"""
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'rb') as f:
+                payload = pickle.load(f)
+            if payload.get('fingerprint') == self.fingerprint:
+                self.entries = payload['entries']
+            else:
+                logger.info("🗃️ 缓存指纹不匹配，执行完整合并")
+        except Exception as e:
+            logger.warning(f"⚠️ 无法加载增量缓存，执行完整合并: {e}")
+    
+    def get(self, file_path: Path) -> Optional[Dict]:
+        """查询文件的缓存部分结果，文件已变化时返回None"""
+        entry = self.entries.get(str(file_path))
+        if entry is not None:
+            stat = file_path.stat()
+            if (entry['mtime_ns'], entry['size']) == (stat.st_mtime_ns, stat.st_size):
+                self.hits += 1
+                return entry['partial']
+            if entry['size'] == stat.st_size and entry['sha256'] == self.hash_file(file_path):
+                entry['mtime_ns'] = stat.st_mtime_ns
+                self.hits += 1
+                return entry['partial']
+        self.misses += 1
+        return None
+    
+    def put(self, file_path: Path, partial_result: Dict):
+        """记录文件的部分结果"""
+        stat = file_path.stat()
+        self.entries[str(file_path)] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': self.hash_file(file_path),
+            'partial': partial_result
+        }
+    
+    def save(self, file_list: List[Tuple[int, str, Path]]):
+        """持久化缓存，仅保留当前仍存在的文件条目"""
+        live = {str(file_path) for _, _, file_path in file_list}
+        self.entries = {key: entry for key, entry in self.entries.items() if key in live}
+        tmp_file = self.cache_file.with_name(self.cache_file.name + '.tmp')
+        try:
+            with open(tmp_file, 'wb') as f:
+                pickle.dump({'fingerprint': self.fingerprint, 'entries': self.entries}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.warning(f"⚠️ 保存增量缓存失败: {e}")
+
 class AIFieldMerger:
     """AI原生字段合并器 - 价值导向 + 精益创业"""
     
-    def __init__(self, fields_dir: str = None, output_file: str = None):
+    def __init__(self, fields_dir: str = None, output_file: str = None, jobs: int = 1,
+                 cache_file: str = None, streaming: bool = False, field_pool: FieldPool = None):
         # 修复路径：指向fields-s1in目录
         base_dir = Path(__file__).parent.parent
         self.fields_dir = Path(fields_dir) if fields_dir else base_dir / 'fields-s1in'
         self.output_dir = base_dir / 'fields-s3out'
         self.output_file = Path(output_file) if output_file else self.output_dir / 'fields.yaml'
+        self.index_file = self.output_file.with_suffix('.colidx')
         self.schema_file = base_dir / 'field_schema.json'
         self.orchestrator_file = base_dir / 'field_orchestrator.yaml'
         
+        # 并行解析进程数：1为串行，0为使用全部CPU核心
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        
+        # 流式输出模式：逐字段写入临时文件后原子替换，不在内存中构建完整字段池
+        self.streaming = streaming
+        
         # 确保输出目录存在
         self.output_dir.mkdir(exist_ok=True)
         
@@ -56,7 +289,27 @@ class AIFieldMerger:
         self.value_chain_positions = ['user_pain_point', 'solution_design', 'business_value']
         
         # 统计信息 - 增强版
-        self.stats = {
+        self.stats = self.create_stats()
+        
+        # 业务分析结果
+        self.business_analysis = self.create_business_analysis()
+        
+        # 最终胜出字段的分析指标，按输出顺序排列（用于导出列式索引）
+        self.field_metrics: Dict[str, FieldMetrics] = {}
+        
+        # 编译后的字段检查函数（按Schema惰性编译）
+        self._field_validator = None
+        self._field_validator_schema = None
+        
+        # 增量合并缓存（为None时不启用）
+        self.cache = MergeCache(Path(cache_file), self.schema_file) if cache_file else None
+        
+        # 共享字段池：合并完成后将结果直接交付给同进程的验证器、修复器（为None时不交付）
+        self.field_pool = field_pool
+    
+    def create_stats(self) -> Dict:
+        """创建空的统计信息结构"""
+        return {
             'total_fields': 0,
             'by_priority': {'P0': 0, 'P1': 0, 'P2': 0, 'P3': 0},
             'by_ai_level': {'L0': 0, 'L1': 0, 'L2': 0},
@@ -72,9 +325,10 @@ class AIFieldMerger:
             'files_processed': 0,
             'files_failed': 0
         }
-        
-        # 业务分析结果
-        self.business_analysis = {
+    
+    def create_business_analysis(self) -> Dict:
+        """创建空的业务分析结构"""
+        return {
             'high_value_fields': [],
             'mvp_critical_path': [],
             'risk_areas': [],
@@ -98,7 +352,7 @@ class AIFieldMerger:
         try:
             if self.orchestrator_file.exists():
                 with open(self.orchestrator_file, 'r', encoding='utf-8') as f:
-                    config = yaml.safe_load(f)
+                    config = safe_load(f)
                     logger.info(f"✅ 加载编排器配置成功: {self.orchestrator_file}")
                     return config
         except Exception as e:
@@ -125,46 +379,37 @@ class AIFieldMerger:
         else:
             return 3
     
+    def default_field_schema(self) -> Dict:
+        """Schema文件缺失时使用的内置字段Schema（与原手写检查规则一致）"""
+        return {
+            'required': ['zh-CN', 'en-US', 'description', 'type'],
+            'properties': {
+                'priority': {'type': 'string', 'enum': list(self.priority_order)},
+                'ai_collaboration': {'type': 'string', 'enum': list(self.ai_collaboration_levels)},
+                'startup_phase': {'type': 'string', 'enum': self.startup_phases},
+                'value_chain_position': {'type': 'string', 'enum': self.value_chain_positions},
+                'token_budget': {
+                    'type': 'object',
+                    'properties': {'estimated_tokens': {'type': 'number'}}
+                }
+            }
+        }
+    
+    def get_field_validator(self, schema: Dict = None) -> Callable[[Any], List[str]]:
+        """获取编译后的字段检查函数，同一Schema只编译一次"""
+        if self._field_validator is None or self._field_validator_schema is not schema:
+            self._field_validator = compile_field_validator(schema or self.default_field_schema())
+            self._field_validator_schema = schema
+        return self._field_validator
+    
     def validate_field(self, field_name: str, field_data: Dict, schema: Dict = None) -> Tuple[bool, List[str]]:
-        """验证字段是否符合Schema规范 - 增强版"""
-        errors = []
-        
-        if not isinstance(field_data, dict):
-            errors.append("字段数据必须是字典类型")
-            return False, errors
-        
-        # 检查必填字段
-        required_fields = ['zh-CN', 'en-US', 'description', 'type']
-        for req_field in required_fields:
-            if req_field not in field_data:
-                errors.append(f"缺少必填属性: {req_field}")
-        
-        # 检查优先级
-        if 'priority' in field_data:
-            if field_data['priority'] not in self.priority_order:
-                errors.append(f"优先级无效: {field_data['priority']}")
-        
-        # 检查AI协作级别
-        if 'ai_collaboration' in field_data:
-            if field_data['ai_collaboration'] not in self.ai_collaboration_levels:
-                errors.append(f"AI协作级别无效: {field_data['ai_collaboration']}")
-        
-        # 检查精益创业阶段
-        if 'startup_phase' in field_data:
-            if field_data['startup_phase'] not in self.startup_phases:
-                errors.append(f"精益创业阶段无效: {field_data['startup_phase']}")
-        
-        # 检查价值链路位置
-        if 'value_chain_position' in field_data:
-            if field_data['value_chain_position'] not in self.value_chain_positions:
-                errors.append(f"价值链路位置无效: {field_data['value_chain_position']}")
-        
-        # 检查Token预算格式
-        if 'token_budget' in field_data:
-            token_budget = field_data['token_budget']
-            if isinstance(token_budget, dict):
-                if 'estimated_tokens' in token_budget and not isinstance(token_budget['estimated_tokens'], (int, float)):
-                    errors.append("Token预算必须是数字")
+        """验证字段是否符合Schema规范
+        
+        规则完全来自 field_schema.json，比原先手写的检查更严格：priority 为必填，
+        type 须在枚举之内，各属性（含嵌套对象）须符合声明的 JSON 类型与枚举。
+        Schema 文件缺失时回退到 default_field_schema()，即原手写检查的规则。
+        """
+        errors = self.get_field_validator(schema)(field_data)
         
         is_valid = len(errors) == 0
         if not is_valid:
@@ -173,139 +418,11 @@ class AIFieldMerger:
         
         return is_valid, errors
     
-    def analyze_business_value(self, field_name: str, field_data: Dict) -> Dict:
-        """分析字段的商业价值"""
-        analysis = {
-            'user_value_score': 0,
-            'business_value_score': 0,
-            'roi_potential': 'unknown',
-            'market_validation_status': 'pending'
-        }
-        
-        # 基于优先级评分
-        priority = field_data.get('priority', 'P3')
-        priority_scores = {'P0': 10, 'P1': 7, 'P2': 5, 'P3': 3}
-        base_score = priority_scores.get(priority, 3)
-        
-        # MVP关键性加分
-        if field_data.get('mvp_relevance', {}).get('is_mvp_critical', False):
-            base_score += 5
-        
-        # 快速启动兼容性加分
-        if field_data.get('mvp_relevance', {}).get('quick_launch_compatible', False):
-            base_score += 3
-        
-        analysis['user_value_score'] = min(base_score, 10)
-        analysis['business_value_score'] = min(base_score, 10)
-        
-        # 分析商业影响
-        if 'business_impact' in field_data:
-            business_impact = field_data['business_impact']
-            if 'roi_estimate' in business_impact:
-                analysis['roi_potential'] = business_impact['roi_estimate']
-            if 'market_validation' in business_impact:
-                analysis['market_validation_status'] = business_impact['market_validation']
-        
-        # 高价值字段识别
-        if analysis['user_value_score'] >= 8 or analysis['business_value_score'] >= 8:
-            self.business_analysis['high_value_fields'].append(field_name)
-            self.stats['business_impact_high'] += 1
-        
-        return analysis
-    
-    def assess_risks(self, field_name: str, field_data: Dict) -> Dict:
-        """评估字段相关风险"""
-        risk_assessment = {
-            'technical_risk_level': 'low',
-            'market_risk_level': 'low',
-            'execution_risk_level': 'low',
-            'overall_risk_score': 0
-        }
-        
-        # 检查风险缓解措施
-        if 'risk_mitigation' in field_data:
-            risk_mitigation = field_data['risk_mitigation']
-            
-            # 技术风险评估
-            tech_risks = risk_mitigation.get('technical_risks', [])
-            if len(tech_risks) > 2:
-                risk_assessment['technical_risk_level'] = 'high'
-            elif len(tech_risks) > 0:
-                risk_assessment['technical_risk_level'] = 'medium'
-            
-            # 市场风险评估
-            market_risks = risk_mitigation.get('market_risks', [])
-            if len(market_risks) > 2:
-                risk_assessment['market_risk_level'] = 'high'
-            elif len(market_risks) > 0:
-                risk_assessment['market_risk_level'] = 'medium'
-            
-            # 执行风险评估
-            exec_risks = risk_mitigation.get('execution_risks', [])
-            if len(exec_risks) > 2:
-                risk_assessment['execution_risk_level'] = 'high'
-            elif len(exec_risks) > 0:
-                risk_assessment['execution_risk_level'] = 'medium'
-            
-            # 有缓解策略的字段
-            if 'mitigation_strategy' in risk_mitigation:
-                self.stats['risk_mitigation_covered'] += 1
-        
-        # 计算总体风险分数
-        risk_levels = {'low': 1, 'medium': 2, 'high': 3}
-        total_risk = (risk_levels[risk_assessment['technical_risk_level']] + 
-                     risk_levels[risk_assessment['market_risk_level']] + 
-                     risk_levels[risk_assessment['execution_risk_level']])
-        risk_assessment['overall_risk_score'] = total_risk
-        
-        # 高风险字段识别
-        if total_risk >= 7:
-            self.business_analysis['risk_areas'].append(field_name)
-        
-        return risk_assessment
-    
-    def update_statistics(self, field_name: str, field_data: Dict):
-        """更新统计信息 - 增强版"""
-        self.stats['total_fields'] += 1
-        
-        # 按优先级统计
-        priority = field_data.get('priority', 'P3')
-        if priority in self.stats['by_priority']:
-            self.stats['by_priority'][priority] += 1
-        
-        # 按AI协作级别统计
-        ai_level = field_data.get('ai_collaboration', 'L1')
-        if ai_level in self.stats['by_ai_level']:
-            self.stats['by_ai_level'][ai_level] += 1
-        
-        # 按精益创业阶段统计
-        startup_phase = field_data.get('startup_phase')
-        if startup_phase and startup_phase in self.stats['by_startup_phase']:
-            self.stats['by_startup_phase'][startup_phase] += 1
-        
-        # 按价值链路位置统计
-        value_chain_pos = field_data.get('value_chain_position')
-        if value_chain_pos and value_chain_pos in self.stats['by_value_chain']:
-            self.stats['by_value_chain'][value_chain_pos] += 1
-        
-        # Token预算统计
-        if 'token_budget' in field_data and isinstance(field_data['token_budget'], dict):
-            estimated_tokens = field_data['token_budget'].get('estimated_tokens', 0)
-            if isinstance(estimated_tokens, (int, float)):
-                self.stats['token_budget_total'] += estimated_tokens
-        
-        # MVP关键字段统计
-        if field_data.get('mvp_relevance', {}).get('is_mvp_critical', False):
-            self.stats['mvp_critical_fields'] += 1
-            self.business_analysis['mvp_critical_path'].append(field_name)
-        
-        # 快速启动兼容性统计
-        if field_data.get('mvp_relevance', {}).get('quick_launch_compatible', False):
-            self.stats['quick_launch_compatible'] += 1
-        
-        # 可复用模板统计
-        if field_data.get('template_reusability', {}).get('is_reusable', False):
-            self.stats['reusable_templates'] += 1
+    def validate_fields(self, fields_data: Dict, schema: Dict = None) -> Dict[str, List[str]]:
+        """批量验证整个文件的字段，返回验证失败的字段及其错误"""
+        failures = validate_batch(self.get_field_validator(schema), fields_data)
+        self.stats['validation_errors'] += len(failures)
+        return failures
     
     def discover_field_files(self) -> List[Tuple[int, str, Path]]:
         """发现并排序字段文件"""
@@ -332,82 +449,195 @@ class AIFieldMerger:
         logger.info(f"📁 发现 {len(file_list)} 个字段文件")
         return file_list
     
+    def load_field_files(self, file_list: List[Tuple[int, str, Path]]) -> Iterator[Tuple[int, str, Path, Callable[[], Any]]]:
+        """按优先级顺序产出字段文件及其解析结果获取函数
+        
+        并行模式下文件提交到进程池并发解析，但仍按 file_list 顺序产出，
+        合并（冲突处理）在主进程中确定性地归约，输出与串行模式逐字节一致。
+        在途的解析任务最多为进程数的两倍，已产出的任务随即释放，内存中不会积累全部文件的解析结果。
+        解析异常在调用获取函数时抛出，由调用方按原有逻辑处理。
+        """
+        if self.jobs <= 1 or len(file_list) <= 1:
+            for priority, filename, file_path in file_list:
+                yield priority, filename, file_path, partial(load_yaml_file, file_path)
+            return
+        
+        logger.info(f"⚡ 并行解析模式: {self.jobs} 个进程")
+        workers = min(self.jobs, len(file_list))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            remaining = iter(file_list)
+            in_flight = deque()
+            for item in islice(remaining, workers * 2):
+                in_flight.append((item, executor.submit(load_yaml_file, item[2])))
+            while in_flight:
+                (priority, filename, file_path), future = in_flight.popleft()
+                for item in islice(remaining, 1):
+                    in_flight.append((item, executor.submit(load_yaml_file, item[2])))
+                yield priority, filename, file_path, future.result
+                del future
+    
+    @staticmethod
+    def extract_fields_data(data: Dict) -> Dict:
+        """返回文件中的字段字典，兼容 'fields' 嵌套结构"""
+        if 'fields' in data and isinstance(data['fields'], dict):
+            return data['fields']
+        return data
+    
+    def process_field_data(self, filename: str, data: Any, schema: Dict = None) -> Dict:
+        """验证并分析单个文件的字段，返回可缓存、可累加的部分结果
+        
+        部分结果包含按文件顺序排列的有效字段及其分析指标，以及文件级计数（已处理文件、验证错误）。
+        字段统计只在合并归约后对最终胜出字段汇总，见 analyze_fields。
+        """
+        stats = self.stats
+        self.stats = {'files_processed': 0, 'validation_errors': 0}
+        valid_fields = []
+        
+        try:
+            if not data:
+                logger.warning(f"⚠️ 文件为空: {filename}")
+            else:
+                self.stats['files_processed'] += 1
+                
+                # 处理嵌套结构：检查是否有 'fields' 键
+                fields_data = self.extract_fields_data(data)
+                if fields_data is not data:
+                    logger.info(f"📋 检测到嵌套结构，处理 'fields' 键下的内容")
+                
+                # 跳过元数据字段
+                candidates = {
+                    field_name: field_data for field_name, field_data in fields_data.items()
+                    if not (field_name.startswith('_') or field_name in ['version', 'meta', 'config', 'fields'])
+                }
+                
+                # 批量验证字段
+                failures = self.validate_fields(candidates, schema)
+                
+                for field_name, field_data in candidates.items():
+                    if field_name in failures:
+                        logger.warning(f"⚠️ 字段验证失败，跳过: {field_name} - {'; '.join(failures[field_name])}")
+                        continue
+                    
+                    valid_fields.append((field_name, field_data, extract_field_metrics(field_data)))
+            
+            return {'fields': valid_fields, 'stats': self.stats}
+        finally:
+            self.stats = stats
+    
+    def accumulate_partial(self, partial_result: Dict):
+        """将单个文件的文件级计数累加到全局统计中"""
+        add_counts(self.stats, partial_result['stats'])
+    
+    def analyze_fields(self, field_metrics: Dict[str, FieldMetrics]):
+        """对最终胜出字段执行单遍分析，按输出顺序汇总统计与业务分析"""
+        self.field_metrics = field_metrics
+        analytics = FieldAnalytics(self.stats, self.business_analysis)
+        for field_name, metrics in field_metrics.items():
+            analytics.add(field_name, metrics)
+    
+    def iter_file_partials(self, file_list: List[Tuple[int, str, Path]],
+                           schema: Dict = None) -> Iterator[Tuple[int, str, Path, Optional[Dict]]]:
+        """按优先级顺序产出每个文件的部分结果，缓存命中的文件无需重新解析
+        
+        解析失败的文件产出 None 并计入 files_failed。
+        """
+        cached = {}
+        if self.cache:
+            cached = {file_path: self.cache.get(file_path) for _, _, file_path in file_list}
+            cached = {file_path: entry for file_path, entry in cached.items() if entry is not None}
+            logger.info(f"🗃️ 增量缓存命中 {len(cached)}/{len(file_list)} 个文件")
+        
+        pending = [item for item in file_list if item[2] not in cached]
+        loaded = self.load_field_files(pending)
+        
+        for priority, filename, file_path in file_list:
+            if file_path in cached:
+                logger.info(f"📄 处理文件: {filename} (优先级: P{priority}, 缓存命中)")
+                yield priority, filename, file_path, cached.pop(file_path)
+                continue
+            
+            _, _, _, load_data = next(loaded)
+            logger.info(f"📄 处理文件: {filename} (优先级: P{priority})")
+            
+            try:
+                partial_result = self.process_field_data(filename, load_data(), schema)
+            except yaml.YAMLError as e:
+                logger.error(f"❌ YAML解析错误 {filename}: {e}")
+                self.stats['files_failed'] += 1
+                partial_result = None
+            except Exception as e:
+                logger.error(f"❌ 处理文件错误 {filename}: {e}")
+                self.stats['files_failed'] += 1
+                partial_result = None
+            
+            if partial_result is not None and self.cache:
+                self.cache.put(file_path, partial_result)
+            yield priority, filename, file_path, partial_result
+        
+        loaded.close()
+    
     def merge_fields(self) -> Dict:
         """合并所有字段文件 - 增强版"""
         logger.info("🚀 开始AI原生字段合并...")
+        logger.info(f"⚙️ YAML后端: {YAML_BACKEND}")
         
         # 加载配置
         schema = self.load_schema()
         orchestrator_config = self.load_orchestrator_config()
         
         merged_data = {}
+        field_metrics: Dict[str, FieldMetrics] = {}
         file_list = self.discover_field_files()
         
         if not file_list:
             logger.error("❌ 未找到任何字段文件")
             return {}
         
-        # 合并字段
-        for priority, filename, file_path in file_list:
-            logger.info(f"📄 处理文件: {filename} (优先级: P{priority})")
+        # 合并字段：逐文件获取部分结果（缓存命中或重新解析），再按优先级顺序归约
+        for priority, filename, file_path, partial_result in self.iter_file_partials(file_list, schema):
+            if partial_result is None:
+                continue
             
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
-                    
-                    if not data:
-                        logger.warning(f"⚠️ 文件为空: {filename}")
-                        continue
-                    
-                    self.stats['files_processed'] += 1
-                    
-                    # 处理嵌套结构：检查是否有 'fields' 键
-                    fields_data = data
-                    if 'fields' in data and isinstance(data['fields'], dict):
-                        fields_data = data['fields']
-                        logger.info(f"📋 检测到嵌套结构，处理 'fields' 键下的内容")
-                    
-                    for field_name, field_data in fields_data.items():
-                        # 跳过元数据字段
-                        if field_name.startswith('_') or field_name in ['version', 'meta', 'config', 'fields']:
-                            continue
-                        
-                        # 验证字段
-                        is_valid, errors = self.validate_field(field_name, field_data, schema)
-                        
-                        if is_valid:
-                            # 处理字段冲突
-                            if field_name in merged_data:
-                                existing_priority = merged_data[field_name].get('priority', 'P3')
-                                new_priority = field_data.get('priority', 'P3')
-                                
-                                # 高优先级覆盖低优先级
-                                if self.priority_order[new_priority] <= self.priority_order[existing_priority]:
-                                    merged_data[field_name] = field_data
-                                    logger.info(f"🔄 字段 {field_name} 被 {new_priority} 优先级覆盖")
-                            else:
-                                merged_data[field_name] = field_data
-                                logger.info(f"✅ 添加字段: {field_name}")
-                            
-                            # 更新统计和分析
-                            self.update_statistics(field_name, field_data)
-                            self.analyze_business_value(field_name, field_data)
-                            self.assess_risks(field_name, field_data)
-                        else:
-                            logger.warning(f"⚠️ 字段验证失败，跳过: {field_name} - {'; '.join(errors)}")
+            self.accumulate_partial(partial_result)
+            
+            for field_name, field_data, metrics in partial_result['fields']:
+                # 处理字段冲突
+                if field_name in merged_data:
+                    existing_priority = merged_data[field_name].get('priority', 'P3')
+                    new_priority = field_data.get('priority', 'P3')
                     
-            except yaml.YAMLError as e:
-                logger.error(f"❌ YAML解析错误 {filename}: {e}")
-                self.stats['files_failed'] += 1
-            except Exception as e:
-                logger.error(f"❌ 处理文件错误 {filename}: {e}")
-                self.stats['files_failed'] += 1
+                    # 高优先级覆盖低优先级
+                    if self.should_override(existing_priority, new_priority):
+                        merged_data[field_name] = field_data
+                        field_metrics[field_name] = metrics
+                        logger.info(f"🔄 字段 {field_name} 被 {new_priority} 优先级覆盖")
+                else:
+                    merged_data[field_name] = field_data
+                    field_metrics[field_name] = metrics
+                    logger.info(f"✅ 添加字段: {field_name}")
+        
+        if self.cache:
+            self.cache.save(file_list)
+        
+        # 仅对最终胜出字段做统计与分析
+        self.analyze_fields(field_metrics)
         
         # 生成优化建议
         self.generate_optimization_recommendations()
         
         # 添加元数据
-        merged_data['_meta'] = {
+        merged_data['_meta'] = self.build_meta(orchestrator_config)
+        
+        logger.info(f"✅ 合并完成，共处理 {self.stats['total_fields']} 个字段")
+        return merged_data
+    
+    def should_override(self, existing_priority: str, new_priority: str) -> bool:
+        """字段冲突时判断新字段是否覆盖已有字段：同级或更高优先级覆盖"""
+        return self.priority_order[new_priority] <= self.priority_order[existing_priority]
+    
+    def build_meta(self, orchestrator_config: Optional[Dict]) -> Dict:
+        """构建合并结果的 _meta 元数据"""
+        meta = {
             'generated_at': datetime.now().isoformat(),
             'generator': 'AI原生字段合并器 v5.1',
             'version': 'v5.1-ai-native-enhanced-fixed',
@@ -419,10 +649,108 @@ class AIFieldMerger:
         }
         
         if orchestrator_config:
-            merged_data['_meta']['orchestrator_config'] = orchestrator_config.get('global_config', {})
+            meta['orchestrator_config'] = orchestrator_config.get('global_config', {})
+        
+        return meta
+    
+    def stream_merge_fields(self) -> bool:
+        """流式合并：逐字段写入临时文件，最后写入 _meta 并原子替换输出文件
+        
+        第一遍逐文件验证并统计，只记录每个字段的胜出来源（不保留字段内容）；
+        第二遍按优先级顺序重新读取文件，每个文件的胜出字段立即序列化：轮到其输出位置的直接写出，
+        输出位置靠前的字段来自较晚文件（被覆盖）时，其后的字段暂存到磁盘上的临时文件，轮到时再复制写出。
+        内存中同时只保留当前文件的解析结果（并行时另加在途的若干文件）以及每字段一项的胜出来源与暂存偏移，
+        不随字段池内容大小增长；启用 --incremental 时增量缓存仍会持有各文件的部分结果直至保存。
+        输出与 merge_fields + save_merged_data 逐字节一致。
+        """
+        logger.info("🚀 开始AI原生字段流式合并...")
+        logger.info(f"⚙️ YAML后端: {YAML_BACKEND}")
+        
+        schema = self.load_schema()
+        orchestrator_config = self.load_orchestrator_config()
+        
+        file_list = self.discover_field_files()
+        if not file_list:
+            logger.error("❌ 未找到任何字段文件")
+            return False
+        
+        # 第一遍：字段名 → (胜出文件, 分析指标)，字典插入顺序即输出顺序
+        winners: Dict[str, Tuple[Path, FieldMetrics]] = {}
+        for priority, filename, file_path, partial_result in self.iter_file_partials(file_list, schema):
+            if partial_result is None:
+                continue
+            
+            self.accumulate_partial(partial_result)
+            
+            for field_name, field_data, metrics in partial_result['fields']:
+                if field_name in winners:
+                    if self.should_override(winners[field_name][1].priority, metrics.priority):
+                        winners[field_name] = (file_path, metrics)
+                        logger.info(f"🔄 字段 {field_name} 被 {metrics.priority} 优先级覆盖")
+                else:
+                    winners[field_name] = (file_path, metrics)
+                    logger.info(f"✅ 添加字段: {field_name}")
+        
+        if self.cache:
+            self.cache.save(file_list)
+        
+        self.analyze_fields({field_name: metrics for field_name, (_, metrics) in winners.items()})
+        
+        self.generate_optimization_recommendations()
+        
+        # 第二遍：按输出位置写出胜出字段
+        positions = {field_name: index for index, field_name in enumerate(winners)}
+        fields_by_file: Dict[Path, List[str]] = {}
+        for field_name, (file_path, _) in winners.items():
+            fields_by_file.setdefault(file_path, []).append(field_name)
+        
+        tmp_file = self.output_file.with_name(self.output_file.name + '.tmp')
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f, tempfile.TemporaryFile(dir=self.output_file.parent) as spill:
+                # 输出位置 → 暂存文件中的 (偏移, 长度)
+                spilled: Dict[int, Tuple[int, int]] = {}
+                next_position = 0
+                source_files = [item for item in file_list if item[2] in fields_by_file]
+                
+                for _, filename, file_path, load_data in self.load_field_files(source_files):
+                    fields_data = self.extract_fields_data(load_data())
+                    for field_name in fields_by_file.pop(file_path):
+                        chunk = safe_dump({field_name: fields_data[field_name]}, **FIELDS_DUMP_OPTIONS)
+                        position = positions.pop(field_name)
+                        if position != next_position:
+                            data = chunk.encode('utf-8')
+                            spill.seek(0, os.SEEK_END)
+                            spilled[position] = (spill.tell(), len(data))
+                            spill.write(data)
+                            continue
+                        
+                        f.write(chunk)
+                        next_position += 1
+                        while next_position in spilled:
+                            offset, length = spilled.pop(next_position)
+                            spill.seek(offset)
+                            f.write(spill.read(length).decode('utf-8'))
+                            next_position += 1
+                    del fields_data
+                
+                safe_dump({'_meta': self.build_meta(orchestrator_config)}, f, **FIELDS_DUMP_OPTIONS)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            os.replace(tmp_file, self.output_file)
+        except Exception as e:
+            logger.error(f"❌ 流式写入失败: {e}")
+            if tmp_file.exists():
+                tmp_file.unlink()
+            return False
         
         logger.info(f"✅ 合并完成，共处理 {self.stats['total_fields']} 个字段")
-        return merged_data
+        logger.info(f"💾 合并结果已保存到: {self.output_file}")
+        
+        self.save_field_index()
+        self.save_analysis_report()
+        self.print_statistics()
+        return True
     
     def generate_optimization_recommendations(self):
         """生成优化建议"""
@@ -454,18 +782,13 @@ class AIFieldMerger:
         try:
             with open(self.output_file, 'w', encoding='utf-8') as f:
                 # 自定义YAML输出格式
-                yaml.dump(
-                    merged_data, 
-                    f, 
-                    allow_unicode=True, 
-                    sort_keys=False, 
-                    default_flow_style=False, 
-                    indent=2,
-                    width=120
-                )
+                safe_dump(merged_data, f, **FIELDS_DUMP_OPTIONS)
             
             logger.info(f"💾 合并结果已保存到: {self.output_file}")
             
+            # 保存列式索引
+            self.save_field_index()
+            
             # 保存分析报告
             self.save_analysis_report()
             
@@ -475,6 +798,33 @@ class AIFieldMerger:
         except Exception as e:
             logger.error(f"❌ 保存文件失败: {e}")
     
+    def save_field_index(self):
+        """导出列式字段索引，供仪表盘等进行向量化聚合查询"""
+        rows = (
+            (field_name, {
+                'priority': metrics.priority,
+                'ai_collaboration': metrics.ai_collaboration,
+                'startup_phase': metrics.startup_phase,
+                'value_chain_position': metrics.value_chain_position,
+                'estimated_tokens': metrics.estimated_tokens,
+                'is_mvp_critical': metrics.is_mvp_critical,
+                'tags': metrics.tags
+            })
+            for field_name, metrics in self.field_metrics.items()
+        )
+        categories = {
+            'priority': list(self.priority_order),
+            'ai_collaboration': list(self.ai_collaboration_levels),
+            'startup_phase': self.startup_phases,
+            'value_chain_position': self.value_chain_positions
+        }
+        
+        try:
+            row_count = write_field_index(self.index_file, rows, categories)
+            logger.info(f"🗂️ 列式索引已保存到: {self.index_file} ({row_count} 行)")
+        except Exception as e:
+            logger.warning(f"⚠️ 保存列式索引失败: {e}")
+    
     def save_analysis_report(self):
         """保存分析报告"""
         report_file = self.output_dir / 'analysis_report.json'
@@ -561,22 +911,49 @@ class AIFieldMerger:
     def run(self) -> bool:
         """执行合并流程"""
         try:
+            if self.streaming:
+                success = self.stream_merge_fields()
+                if success and self.field_pool is not None:
+                    # 流式模式不在内存中保留字段池，改为从输出文件延迟加载
+                    self.field_pool.reload(self.output_file)
+                return success
             merged_data = self.merge_fields()
             if merged_data:
                 self.save_merged_data(merged_data)
+                if self.field_pool is not None:
+                    self.field_pool.publish(merged_data, self.output_file)
                 return True
             return False
         except Exception as e:
             logger.error(f"❌ 合并流程执行失败: {e}")
             return False
 
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='AI原生字段合并器')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='并行解析YAML的进程数（默认1为串行，0为使用全部CPU核心）')
+    parser.add_argument('--incremental', action='store_true',
+                        help='启用增量合并缓存，仅重新处理内容变化的字段文件')
+    parser.add_argument('--stream', action='store_true',
+                        help='流式写出合并结果，峰值内存受单个分片文件约束')
+    parser.add_argument('--cache-file', default=None,
+                        help='增量缓存文件路径（默认 fields-s3out/.merge_cache.pkl）')
+    return parser.parse_args()
+
 def main():
     """主函数"""
+    args = parse_args()
+    
     print("🚀 启动AI原生字段合并器...")
     print("价值链路: 用户痛点→解决方案→商业价值")
     print("发展路径: 一人草创→多智能体编排→可持续盈利增长\n")
     
-    merger = AIFieldMerger()
+    cache_file = args.cache_file
+    if args.incremental and not cache_file:
+        cache_file = Path(__file__).parent.parent / 'fields-s3out' / '.merge_cache.pkl'
+    
+    merger = AIFieldMerger(jobs=args.jobs, cache_file=cache_file, streaming=args.stream)
     success = merger.run()
     
     if success:
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原子文件写入层
+先写同目录临时文件并 fsync，再以 os.replace 原子替换；多文件写入作为一个事务提交，
+可选按内容哈希去重的备份；读-改-写场景通过旁路锁文件加锁并在替换前校验内容未被他人修改
+"""
+
+import binascii
+import hashlib
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # 非 POSIX 平台：不加锁，仍校验内容哈希
+    fcntl = None
+
+BACKUP_DIR_NAME = '.backups'
+
+PathLike = Union[str, Path]
+
+
+class ConcurrentModificationError(RuntimeError):
+    """目标文件在读取之后被其他进程修改，本次提交未写入任何文件"""
+
+
+def content_digest(data: Optional[bytes]) -> Optional[str]:
+    """内容的 sha256；文件不存在（None）时为 None"""
+    return None if data is None else hashlib.sha256(data).hexdigest()
+
+
+def file_digest(file_path: PathLike) -> Optional[str]:
+    """文件当前内容的 sha256；文件不存在时为 None"""
+    return content_digest(_read_bytes(Path(file_path)))
+
+
+def _read_bytes(file_path: Path) -> Optional[bytes]:
+    try:
+        return file_path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _fsync_dir(directory: Path):
+    """同步目录项，确保 rename 持久化（不支持的平台忽略）"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_temp(file_path: Path, data: bytes) -> Path:
+    """在目标同目录写入唯一命名的临时文件并 fsync，返回临时文件路径
+
+    新文件以 0666 创建，由内核按进程 umask 裁剪（与普通 open 新建文件一致）；目标已存在时沿用其权限。
+    """
+    while True:
+        tmp_path = file_path.with_name(f'.{file_path.name}.{binascii.hexlify(os.urandom(6)).decode()}.tmp')
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+            break
+        except FileExistsError:
+            continue
+    try:
+        try:
+            os.chmod(fd, file_path.stat().st_mode & 0o7777)
+        except (FileNotFoundError, NotImplementedError):
+            pass
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+@contextmanager
+def lock_files(paths: Iterable[PathLike]) -> Iterator[None]:
+    """对多个目标文件加排他的建议锁（旁路锁文件 .<文件名>.lock，按路径排序加锁避免死锁）
+
+    flock 锁属于打开的文件描述，同一进程的不同线程之间同样互斥；不可重入。
+    """
+    if fcntl is None:
+        yield
+        return
+
+    handles = []
+    try:
+        for file_path in sorted({Path(p).absolute() for p in paths}):
+            lock_path = file_path.with_name(f'.{file_path.name}.lock')
+            handle = open(lock_path, 'a')
+            handles.append(handle)
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        yield
+    finally:
+        for handle in reversed(handles):
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            handle.close()
+
+
+def backup_file(file_path: PathLike, backup_dir: PathLike = None) -> Optional[Path]:
+    """按内容哈希备份文件：<备份目录>/<文件名主干>.<sha256前16位><后缀>，相同内容只保留一份
+
+    备份目录默认为文件所在目录下的 .backups；文件不存在时返回 None。
+    """
+    file_path = Path(file_path)
+    if not file_path.exists():
+        return None
+
+    data = file_path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    backup_dir = Path(backup_dir) if backup_dir else file_path.parent / BACKUP_DIR_NAME
+    backup_path = backup_dir / f"{file_path.stem}.{digest}{file_path.suffix}"
+
+    if not backup_path.exists():
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        os.replace(_write_temp(backup_path, data), backup_path)
+    return backup_path
+
+
+def atomic_write_text(file_path: PathLike, text: str, encoding: str = 'utf-8'):
+    """原子写入单个文本文件"""
+    commit_files({file_path: text}, encoding=encoding)
+
+
+def commit_files(files: Dict[PathLike, str], backup: bool = False,
+                 backup_dir: PathLike = None, encoding: str = 'utf-8',
+                 expected: Dict[PathLike, Optional[str]] = None) -> List[Path]:
+    """以事务方式写入多个文本文件，返回创建或复用的备份路径
+
+    先为所有文件写好并 fsync 临时文件，任何一个失败则清理全部临时文件、不改动目标文件；
+    全部就绪后（可选备份）逐个 os.replace 原子替换，每个目标文件始终是某一次完整写入的结果。
+
+    expected 为读-改-写场景中修改所基于的内容哈希（file_digest，文件不存在为 None）：
+    此时在旁路锁内重新校验各目标文件，任一与 expected 不符则抛出 ConcurrentModificationError、不写入任何文件，
+    调用方应重新读取后重试。不传 expected 时为无条件覆盖写入，不加锁。
+
+    替换过程中出现异常时，已替换的文件恢复为原内容后再抛出；进程在替换过程中被强制终止则无法回滚，
+    此时部分文件可能已更新，可从 backup 产生的备份手动恢复。
+    """
+    paths = {Path(file_path): text for file_path, text in files.items()}
+    if expected is None:
+        return _commit(paths, backup, backup_dir, encoding)
+
+    expected = {Path(file_path): digest for file_path, digest in expected.items()}
+    with lock_files(paths):
+        for file_path in paths:
+            if file_path in expected and file_digest(file_path) != expected[file_path]:
+                raise ConcurrentModificationError(f'{file_path} 在读取后已被修改')
+        return _commit(paths, backup, backup_dir, encoding)
+
+
+def _commit(files: Dict[Path, str], backup: bool, backup_dir: PathLike, encoding: str) -> List[Path]:
+    staged = []
+    try:
+        for file_path, text in files.items():
+            staged.append((file_path, _write_temp(file_path, text.encode(encoding))))
+    except BaseException:
+        for _, tmp_path in staged:
+            tmp_path.unlink()
+        raise
+
+    backups = []
+    originals: Dict[Path, Optional[bytes]] = {}
+    try:
+        if backup:
+            for file_path, _ in staged:
+                backup_path = backup_file(file_path, backup_dir)
+                if backup_path:
+                    backups.append(backup_path)
+        if len(staged) > 1:
+            # 保留原内容，替换中途失败时回滚
+            originals = {file_path: _read_bytes(file_path) for file_path, _ in staged}
+    except BaseException:
+        for _, tmp_path in staged:
+            tmp_path.unlink()
+        raise
+
+    replaced = []
+    try:
+        for file_path, tmp_path in staged:
+            os.replace(tmp_path, file_path)
+            replaced.append(file_path)
+    except BaseException:
+        for _, tmp_path in staged[len(replaced):]:
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+        _rollback(replaced, originals)
+        raise
+
+    for directory in {file_path.parent for file_path, _ in staged}:
+        _fsync_dir(directory)
+
+    return backups
+
+
+def _rollback(replaced: List[Path], originals: Dict[Path, Optional[bytes]]):
+    """将已替换的文件恢复为原内容（原本不存在的文件删除）"""
+    for file_path in replaced:
+        if file_path not in originals:
+            continue
+        data = originals[file_path]
+        if data is None:
+            file_path.unlink()
+        else:
+            os.replace(_write_temp(file_path, data), file_path)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享文档语料读取层
+单次遍历 modules/ 下的 Markdown 文件，逐个内存映射读取，在同一遍中运行多个提取器
+（动态字段引用、硬编码数值、标题），结果供验证器与修复器共用，完整审计每个字节只读一次
+"""
+
+import mmap
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+from hardcoded_scanner import HARDCODED_PATTERNS, HardcodedValueScanner
+
+# 提取器名称
+REFERENCES = 'references'
+HARDCODED = 'hardcoded'
+HEADERS = 'headers'
+
+# 动态字段引用：{{dynamic_fields.FIELD_NAME.sub_path}}
+REFERENCE_PATTERN = re.compile(r'\{\{dynamic_fields\.([A-Z_]+(?:\.[a-z_]+)*)\}\}')
+# Markdown ATX 标题
+HEADER_PATTERN = re.compile(r'^(#{1,6})[ \t]+(.+?)[ \t]*#*[ \t]*$', re.M)
+
+Extractor = Callable[[str], Any]
+
+
+class MarkdownHeader(NamedTuple):
+    """Markdown 标题"""
+    line_number: int
+    level: int
+    title: str
+
+
+class FieldReference(NamedTuple):
+    """动态字段引用"""
+    path: str
+    line_number: int
+
+
+def extract_references(content: str) -> List[str]:
+    """提取动态字段引用路径（按出现顺序，保留重复）"""
+    return REFERENCE_PATTERN.findall(content)
+
+
+def extract_reference_locations(content: str) -> List[FieldReference]:
+    """提取动态字段引用路径及其行号（按出现顺序，保留重复）"""
+    references = []
+    line_number, counted_to = 1, 0
+    for match in REFERENCE_PATTERN.finditer(content):
+        line_number += content.count('\n', counted_to, match.start())
+        counted_to = match.start()
+        references.append(FieldReference(match.group(1), line_number))
+    return references
+
+
+def extract_headers(content: str) -> List[MarkdownHeader]:
+    """提取 ATX 标题及其行号"""
+    headers = []
+    line_number, counted_to = 1, 0
+    for match in HEADER_PATTERN.finditer(content):
+        line_number += content.count('\n', counted_to, match.start())
+        counted_to = match.start()
+        headers.append(MarkdownHeader(line_number, len(match.group(1)), match.group(2)))
+    return headers
+
+
+def read_text(file_path: Union[str, Path]) -> str:
+    """内存映射读取并解码 UTF-8 文本文件
+
+    不做换行转换（CRLF 原样保留），与 hardcoded_scanner.scan_file 及修复器读取方式一致，
+    提取结果中的字符偏移可直接用于改写原文件。
+    """
+    with open(file_path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return str(data, 'utf-8')
+
+
+class CorpusScan:
+    """一次语料遍历的结果
+
+    results[提取器名][文件路径] 为该提取器在该文件上的结果，文件按路径排序；
+    errors[文件路径] 为读取或提取失败的错误信息。
+    """
+
+    def __init__(self, root: Union[str, Path], extractors: Dict[str, Extractor], pattern: str = '*.md'):
+        self.root = Path(root)
+        self.pattern = pattern
+        self.extractors = dict(extractors)
+        self.files: List[Path] = []
+        self.results: Dict[str, Dict[Path, Any]] = {name: {} for name in self.extractors}
+        self.errors: Dict[Path, str] = {}
+        self.bytes_read = 0
+
+    def run(self) -> 'CorpusScan':
+        """遍历语料，对每个文件读取一次并运行全部提取器"""
+        self.files = sorted(self.root.rglob(self.pattern))
+        for file_path in self.files:
+            try:
+                content = read_text(file_path)
+                self.bytes_read += len(content)
+                for name, extractor in self.extractors.items():
+                    self.results[name][file_path] = extractor(content)
+            except Exception as e:
+                self.errors[file_path] = str(e)
+        return self
+
+    def get(self, name: str) -> Optional[Dict[Path, Any]]:
+        """取出某提取器的结果；未注册该提取器时返回 None"""
+        return self.results.get(name)
+
+
+def audit_extractors(scanner: HardcodedValueScanner = None) -> Dict[str, Extractor]:
+    """完整审计使用的提取器：动态字段引用（含行号）、硬编码数值、标题"""
+    scanner = scanner or HardcodedValueScanner(HARDCODED_PATTERNS)
+    return {REFERENCES: extract_reference_locations, HARDCODED: scanner.scan, HEADERS: extract_headers}
+
+
+def scan_corpus(root: Union[str, Path], extractors: Dict[str, Extractor] = None,
+                pattern: str = '*.md') -> CorpusScan:
+    """单遍扫描语料，默认运行完整审计提取器
+
+    同一个 CorpusScan 可依次传给 FieldPoolValidator.validate_all 与修复器的 scan_hardcoded_values，
+    二者直接复用已提取的结果而不再读取文件。
+    """
+    if extractors is None:
+        extractors = audit_extractors()
+    return CorpusScan(root, extractors, pattern).run()
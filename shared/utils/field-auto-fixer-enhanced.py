@@ -4,18 +4,33 @@ AIRVIO 字段自动修复工具 - 增强版
 自动检测硬编码数值并将缺失的配置参数填入 fields-s1in 相应文件
 """
 
+import argparse
 import os
 import re
-import yaml
+import sys
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from atomic_io import ConcurrentModificationError, commit_files, content_digest
+from corpus_reader import HARDCODED, CorpusScan
+from hardcoded_scanner import HARDCODED_PATTERNS, HardcodedMatch, HardcodedValueScanner, scan_file, scan_files
+from yaml_io import safe_dump, safe_load
+from yaml_patch import FieldsBlockIndex
+
+NON_ALNUM_PATTERN = re.compile(r'[^a-zA-Z0-9]')
+# 写回时遇到并发修改的最大尝试次数
+COMMIT_ATTEMPTS = 3
+
 class FieldAutoFixerEnhanced:
-    def __init__(self, modules_dir: str, fields_s1in_dir: str):
+    def __init__(self, modules_dir: str, fields_s1in_dir: str, jobs: int = 1, chunksize: int = None):
         self.modules_dir = Path(modules_dir)
         self.fields_s1in_dir = Path(fields_s1in_dir)
+        self.jobs = jobs
+        self.chunksize = chunksize
         self.hardcoded_patterns = self._define_hardcoded_patterns()
+        self.scanner = HardcodedValueScanner(self.hardcoded_patterns)
         
         # 定义字段分类到文件的映射
         self.category_to_file_mapping = {
@@ -31,37 +46,28 @@ class FieldAutoFixerEnhanced:
         
     def _define_hardcoded_patterns(self) -> List[Tuple[str, str]]:
         """定义硬编码数值的正则表达式模式"""
-        return [
-            # 时间模式
-            (r'\b(\d+-\d+)周\b', 'TIME_BUDGETS'),
-            (r'\b(\d+)小时\b', 'TIME_BUDGETS'),
-            (r'\b(\d+-\d+)天\b', 'TIME_BUDGETS'),
-            (r'\b(\d+)分钟\b', 'TIME_BUDGETS'),
-            
-            # 百分比模式
-            (r'\b(≥\d+%)\b', 'SUCCESS_THRESHOLDS'),
-            (r'\b(≤\d+%)\b', 'SUCCESS_THRESHOLDS'),
-            (r'\b(\d+%:\d+%)\b', 'HUMAN_AI_RATIOS'),
-            (r'\b(\d+%)\b', 'SUCCESS_THRESHOLDS'),
-            
-            # Token预算模式
-            (r'\b(\d+T)\b', 'TOKEN_BUDGETS'),
-            
-            # 金额模式
-            (r'\$([\d,]+[KMB]?)\b', 'FINANCIAL_THRESHOLDS'),
-            
-            # 数量模式
-            (r'\b(≥\d+个)\b', 'QUANTITY_THRESHOLDS'),
-            (r'\b(≥\d+年)\b', 'EXPERIENCE_THRESHOLDS'),
-            (r'\b(≤\d+秒)\b', 'PERFORMANCE_METRICS'),
-        ]
+        return list(HARDCODED_PATTERNS)
     
-    def scan_hardcoded_values(self) -> Dict[str, List[Dict]]:
-        """扫描所有模块文件中的硬编码数值"""
+    def scan_hardcoded_values(self, corpus: CorpusScan = None) -> Dict[str, List[Dict]]:
+        """扫描所有模块文件中的硬编码数值（jobs > 1 时多进程并行，结果按路径排序）
+        
+        传入已包含硬编码数值提取结果的语料扫描（corpus_reader.scan_corpus）时直接复用，不再读取文件。
+        """
         hardcoded_findings = {}
         
-        for md_file in self.modules_dir.rglob('*.md'):
-            findings = self._scan_file(md_file)
+        if corpus is not None and corpus.get(HARDCODED) is not None:
+            matches_by_file = corpus.get(HARDCODED)
+            scanned = ((md_file, matches_by_file.get(md_file, []), corpus.errors.get(md_file))
+                       for md_file in corpus.files)
+        else:
+            md_files = sorted(self.modules_dir.rglob('*.md'))
+            scanned = scan_files(self.scanner, md_files, self.jobs, self.chunksize)
+        
+        for md_file, matches, error in scanned:
+            if error:
+                print(f"Error scanning {md_file}: {error}")
+                continue
+            findings = self._build_findings(matches)
             if findings:
                 hardcoded_findings[str(md_file)] = findings
                 
@@ -69,42 +75,32 @@ class FieldAutoFixerEnhanced:
     
     def _scan_file(self, file_path: Path) -> List[Dict]:
         """扫描单个文件中的硬编码数值"""
-        findings = []
-        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                lines = content.split('\n')
-                
-            for line_num, line in enumerate(lines, 1):
-                for pattern, category in self.hardcoded_patterns:
-                    matches = re.finditer(pattern, line)
-                    for match in matches:
-                        value = match.group(1) if match.groups() else match.group(0)
-                        
-                        # 检查是否已经是动态字段引用
-                        if '{{dynamic_fields.' in line:
-                            continue
-                            
-                        finding = {
-                            'line_number': line_num,
-                            'line_content': line.strip(),
-                            'hardcoded_value': value,
-                            'category': category,
-                            'suggested_field': self._suggest_field_name(value, category),
-                            'target_file': self.category_to_file_mapping.get(category, 'core-p0.yaml')
-                        }
-                        findings.append(finding)
-                        
+            return self._build_findings(scan_file(self.scanner, file_path))
         except Exception as e:
             print(f"Error scanning {file_path}: {e}")
-            
+            return []
+    
+    def _build_findings(self, matches: List[HardcodedMatch]) -> List[Dict]:
+        """将扫描匹配转换为发现记录"""
+        findings = []
+        for match in matches:
+            value, category = match.value, match.category
+            finding = {
+                'line_number': match.line_number,
+                'line_content': match.line_content,
+                'hardcoded_value': value,
+                'category': category,
+                'suggested_field': self._suggest_field_name(value, category),
+                'target_file': self.category_to_file_mapping.get(category, 'core-p0.yaml')
+            }
+            findings.append(finding)
         return findings
     
     def _suggest_field_name(self, value: str, category: str) -> str:
         """为硬编码值建议字段名称"""
         # 清理值中的特殊字符
-        clean_value = re.sub(r'[^a-zA-Z0-9]', '_', value.upper())
+        clean_value = NON_ALNUM_PATTERN.sub('_', value.upper())
         
         field_mapping = {
             'TIME_BUDGETS': f'TIME_BUDGET_{clean_value}',
@@ -193,8 +189,13 @@ class FieldAutoFixerEnhanced:
             }
         }
     
-    def add_fields_to_files(self, hardcoded_findings: Dict) -> Dict[str, int]:
-        """将缺失的字段添加到相应的 YAML 文件中"""
+    def add_fields_to_files(self, hardcoded_findings: Dict, backup: bool = True) -> Dict[str, int]:
+        """将缺失的字段添加到相应的 YAML 文件中
+        
+        所有目标文件先在内存中完成修改，再作为一个事务原子写回（临时文件 + fsync + rename）；
+        没有新增字段的文件不重新序列化。backup 为 True 时写回前按内容哈希备份到 .backups 目录。
+        写回时在锁内校验各文件自读取后未被修改（如另一个修复器同时运行），被修改则重新读取、合并后重试。
+        """
         results = {'files_updated': 0, 'fields_added': 0}
         
         # 按目标文件分组字段
@@ -206,60 +207,100 @@ class FieldAutoFixerEnhanced:
                     fields_by_file[target_file] = []
                 fields_by_file[target_file].append(finding)
         
-        # 为每个文件添加字段
-        for target_file, findings in fields_by_file.items():
-            file_path = self.fields_s1in_dir / target_file
-            if self._add_fields_to_file(file_path, findings):
-                results['files_updated'] += 1
-                results['fields_added'] += len(findings)
+        for _ in range(COMMIT_ATTEMPTS):
+            # 在内存中为每个文件添加字段
+            pending = {}
+            expected = {}
+            fields_added = 0
+            for target_file, findings in fields_by_file.items():
+                file_path = self.fields_s1in_dir / target_file
+                content, added, digest = self._add_fields_to_file(file_path, findings)
+                if content is not None:
+                    pending[file_path] = content
+                    expected[file_path] = digest
+                    fields_added += added
+            
+            if not pending:
+                return results
+            
+            # 事务写回
+            try:
+                backups = commit_files(pending, backup=backup, expected=expected)
+                break
+            except ConcurrentModificationError as e:
+                print(f"字段文件已被其他进程修改，重新读取后重试: {e}")
+            except Exception as e:
+                print(f"Error writing field files, no file was modified: {e}")
+                return results
+        else:
+            print(f"Error writing field files: 重试 {COMMIT_ATTEMPTS} 次后仍有并发修改，no file was modified")
+            return results
         
+        for backup_path in backups:
+            print(f"原文件已备份为: {backup_path.relative_to(self.fields_s1in_dir)}")
+        results['files_updated'] = len(pending)
+        results['fields_added'] = fields_added
         return results
     
-    def _add_fields_to_file(self, file_path: Path, findings: List[Dict]) -> bool:
-        """向单个 YAML 文件添加字段"""
+    def _add_fields_to_file(self, file_path: Path, findings: List[Dict]) -> Tuple[Optional[str], int, Optional[str]]:
+        """在内存中向单个 YAML 文件添加字段，返回 (新文件内容, 新增字段数, 所读取内容的哈希)；无新增或失败时内容为 None
+        
+        新字段以文本块追加到 fields: 映射末尾，去重只依赖按行扫描的键索引，原有内容逐字节不变；
+        fields 无法文本追加（如流式写法）时回退为解析后完整重写。
+        """
+        digest = None
         try:
-            # 读取现有文件
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    existing_data = yaml.safe_load(f) or {}
-            else:
-                existing_data = {'fields': {}}
+            data = file_path.read_bytes() if file_path.exists() else None
+            digest = content_digest(data)
+            index = FieldsBlockIndex(data.decode('utf-8') if data is not None else '')
+            if not index.supported:
+                return self._rewrite_fields_file(file_path, findings, data) + (digest,)
             
-            # 确保有 fields 键
-            if 'fields' not in existing_data:
-                existing_data['fields'] = {}
-            
-            # 添加新字段
-            fields_added = 0
+            # 收集新字段
+            new_fields = {}
             for finding in findings:
-                field_config = self._create_field_config(finding)
                 field_name = finding['suggested_field']
                 
                 # 检查字段是否已存在
-                if field_name not in existing_data['fields']:
-                    existing_data['fields'].update(field_config)
-                    fields_added += 1
+                if field_name not in index and field_name not in new_fields:
+                    new_fields.update(self._create_field_config(finding))
                     print(f"添加字段 {field_name} 到 {file_path.name}")
             
-            if fields_added > 0:
-                # 备份原文件
-                if file_path.exists():
-                    backup_path = file_path.with_suffix(f'.backup.{datetime.now().strftime("%Y%m%d_%H%M%S")}.yaml')
-                    file_path.rename(backup_path)
-                    print(f"原文件已备份为: {backup_path.name}")
-                
-                # 写入更新后的文件
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    yaml.dump(existing_data, f, default_flow_style=False, allow_unicode=True, indent=2)
-                
-                print(f"已更新 {file_path.name}，添加了 {fields_added} 个字段")
-                return True
+            if new_fields:
+                index.append(new_fields, default_flow_style=False, allow_unicode=True, indent=2)
+                print(f"已更新 {file_path.name}，添加了 {len(new_fields)} 个字段")
+                return index.text(), len(new_fields), digest
             
         except Exception as e:
             print(f"Error updating {file_path}: {e}")
-            return False
         
-        return False
+        return None, 0, digest
+    
+    def _rewrite_fields_file(self, file_path: Path, findings: List[Dict], data: bytes) -> Tuple[Optional[str], int]:
+        """解析整个文件（data 为已读取的内容）添加字段后完整重新序列化"""
+        existing_data = safe_load(data.decode('utf-8')) or {}
+        
+        # 确保有 fields 键
+        if not isinstance(existing_data.get('fields'), dict):
+            existing_data['fields'] = {}
+        
+        # 添加新字段
+        fields_added = 0
+        for finding in findings:
+            field_name = finding['suggested_field']
+            
+            # 检查字段是否已存在
+            if field_name not in existing_data['fields']:
+                existing_data['fields'].update(self._create_field_config(finding))
+                fields_added += 1
+                print(f"添加字段 {field_name} 到 {file_path.name}")
+        
+        if fields_added > 0:
+            content = safe_dump(existing_data, default_flow_style=False, allow_unicode=True, indent=2)
+            print(f"已更新 {file_path.name}，添加了 {fields_added} 个字段")
+            return content, fields_added
+        
+        return None, 0
     
     def generate_summary_report(self, hardcoded_findings: Dict, results: Dict) -> str:
         """生成处理结果摘要报告"""
@@ -296,14 +337,27 @@ class FieldAutoFixerEnhanced:
         
         return "\n".join(report)
 
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='硬编码数值扫描与字段修复')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='并行扫描的进程数（默认1为串行，0为使用全部CPU核心）')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='每次派发给工作进程的文件数（默认自动计算，小文件很多时可调大）')
+    parser.add_argument('--no-backup', action='store_true',
+                        help='写回字段文件前不做备份（默认按内容哈希备份到 .backups 目录）')
+    return parser.parse_args()
+
 def main():
     """主函数"""
     # 配置路径
     modules_dir = "/Users/huijoohwee/Documents/999_sandbox/airvio/modules"
     fields_s1in_dir = "/Users/huijoohwee/Documents/999_sandbox/airvio/shared/fields/fields-s1in"
     
+    args = parse_args()
+    
     # 创建增强修复器实例
-    fixer = FieldAutoFixerEnhanced(modules_dir, fields_s1in_dir)
+    fixer = FieldAutoFixerEnhanced(modules_dir, fields_s1in_dir, jobs=args.jobs, chunksize=args.chunksize)
     
     print("开始扫描硬编码数值...")
     
@@ -318,7 +372,7 @@ def main():
     
     # 添加字段到相应文件
     print("\n开始添加字段到配置文件...")
-    results = fixer.add_fields_to_files(hardcoded_findings)
+    results = fixer.add_fields_to_files(hardcoded_findings, backup=not args.no_backup)
     
     # 生成摘要报告
     summary_report = fixer.generate_summary_report(hardcoded_findings, results)
@@ -4,63 +4,67 @@ AIRVIO 字段自动修复工具
 自动检测硬编码数值并替换为动态字段引用
 """
 
+import argparse
 import os
 import re
-import yaml
+import sys
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Mapping, Optional, Tuple, Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from corpus_reader import HARDCODED, CorpusScan
+from hardcoded_scanner import HARDCODED_PATTERNS, HardcodedMatch, HardcodedValueScanner, scan_file, scan_files
+from field_pool import FieldPool
+from lazy_field_pool import LazyFieldPool
+from yaml_io import safe_dump
+
+NON_ALNUM_PATTERN = re.compile(r'[^a-zA-Z0-9]')
 
 class FieldAutoFixer:
-    def __init__(self, fields_yaml_path: str, modules_dir: str):
+    def __init__(self, fields_yaml_path: str, modules_dir: str, jobs: int = 1, chunksize: int = None,
+                 field_pool: FieldPool = None):
         self.fields_yaml_path = Path(fields_yaml_path)
         self.modules_dir = Path(modules_dir)
-        self.fields_data = self._load_fields_yaml()
+        self.jobs = jobs
+        self.chunksize = chunksize
+        # 注入的共享字段池直接复用，否则自行延迟加载 fields.yaml
+        self.fields_data = field_pool if field_pool is not None else self._load_fields_yaml()
         self.hardcoded_patterns = self._define_hardcoded_patterns()
+        self.scanner = HardcodedValueScanner(self.hardcoded_patterns)
         self.missing_fields = []
         self.replacement_map = {}
         
-    def _load_fields_yaml(self) -> Dict[str, Any]:
-        """加载 fields.yaml 文件"""
-        try:
-            with open(self.fields_yaml_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
-        except Exception as e:
-            print(f"Error loading fields.yaml: {e}")
+    def _load_fields_yaml(self) -> Mapping[str, Any]:
+        """延迟加载 fields.yaml 字段注册表：首次访问时建立键索引，只解析实际访问的字段"""
+        if not self.fields_yaml_path.exists():
+            print(f"Error loading fields.yaml: {self.fields_yaml_path} 不存在")
             return {}
+        return LazyFieldPool(self.fields_yaml_path)
     
     def _define_hardcoded_patterns(self) -> List[Tuple[str, str]]:
         """定义硬编码数值的正则表达式模式"""
-        return [
-            # 时间模式
-            (r'\b(\d+-\d+)周\b', 'TIME_BUDGETS'),
-            (r'\b(\d+)小时\b', 'TIME_BUDGETS'),
-            (r'\b(\d+-\d+)天\b', 'TIME_BUDGETS'),
-            (r'\b(\d+)分钟\b', 'TIME_BUDGETS'),
-            
-            # 百分比模式
-            (r'\b(≥\d+%)\b', 'SUCCESS_THRESHOLDS'),
-            (r'\b(≤\d+%)\b', 'SUCCESS_THRESHOLDS'),
-            (r'\b(\d+%:\d+%)\b', 'HUMAN_AI_RATIOS'),
-            (r'\b(\d+%)\b', 'SUCCESS_THRESHOLDS'),
-            
-            # Token预算模式
-            (r'\b(\d+T)\b', 'TOKEN_BUDGETS'),
-            
-            # 金额模式
-            (r'\$([\d,]+[KMB]?)\b', 'FINANCIAL_THRESHOLDS'),
-            
-            # 数量模式
-            (r'\b(≥\d+个)\b', 'QUANTITY_THRESHOLDS'),
-            (r'\b(≥\d+年)\b', 'EXPERIENCE_THRESHOLDS'),
-            (r'\b(≤\d+秒)\b', 'PERFORMANCE_METRICS'),
-        ]
+        return list(HARDCODED_PATTERNS)
     
-    def scan_hardcoded_values(self) -> Dict[str, List[Dict]]:
-        """扫描所有模块文件中的硬编码数值"""
+    def scan_hardcoded_values(self, corpus: CorpusScan = None) -> Dict[str, List[Dict]]:
+        """扫描所有模块文件中的硬编码数值（jobs > 1 时多进程并行，结果按路径排序）
+        
+        传入已包含硬编码数值提取结果的语料扫描（corpus_reader.scan_corpus）时直接复用，不再读取文件。
+        """
         hardcoded_findings = {}
         
-        for md_file in self.modules_dir.rglob('*.md'):
-            findings = self._scan_file(md_file)
+        if corpus is not None and corpus.get(HARDCODED) is not None:
+            matches_by_file = corpus.get(HARDCODED)
+            scanned = ((md_file, matches_by_file.get(md_file, []), corpus.errors.get(md_file))
+                       for md_file in corpus.files)
+        else:
+            md_files = sorted(self.modules_dir.rglob('*.md'))
+            scanned = scan_files(self.scanner, md_files, self.jobs, self.chunksize)
+        
+        for md_file, matches, error in scanned:
+            if error:
+                print(f"Error scanning {md_file}: {error}")
+                continue
+            findings = self._build_findings(matches)
             if findings:
                 hardcoded_findings[str(md_file)] = findings
                 
@@ -68,42 +72,34 @@ class FieldAutoFixer:
     
     def _scan_file(self, file_path: Path) -> List[Dict]:
         """扫描单个文件中的硬编码数值"""
-        findings = []
-        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                lines = content.split('\n')
-                
-            for line_num, line in enumerate(lines, 1):
-                for pattern, category in self.hardcoded_patterns:
-                    matches = re.finditer(pattern, line)
-                    for match in matches:
-                        value = match.group(1) if match.groups() else match.group(0)
-                        
-                        # 检查是否已经是动态字段引用
-                        if '{{dynamic_fields.' in line:
-                            continue
-                            
-                        finding = {
-                            'line_number': line_num,
-                            'line_content': line.strip(),
-                            'hardcoded_value': value,
-                            'category': category,
-                            'suggested_field': self._suggest_field_name(value, category),
-                            'replacement_pattern': self._generate_replacement(value, category)
-                        }
-                        findings.append(finding)
-                        
+            return self._build_findings(scan_file(self.scanner, file_path))
         except Exception as e:
             print(f"Error scanning {file_path}: {e}")
-            
+            return []
+    
+    def _build_findings(self, matches: List[HardcodedMatch]) -> List[Dict]:
+        """将扫描匹配转换为发现记录"""
+        findings = []
+        for match in matches:
+            value, category = match.value, match.category
+            finding = {
+                'line_number': match.line_number,
+                'line_content': match.line_content,
+                'hardcoded_value': value,
+                'category': category,
+                'suggested_field': self._suggest_field_name(value, category),
+                'replacement_pattern': self._generate_replacement(value, category),
+                'start': match.start,
+                'end': match.end
+            }
+            findings.append(finding)
         return findings
     
     def _suggest_field_name(self, value: str, category: str) -> str:
         """为硬编码值建议字段名称"""
         # 清理值中的特殊字符
-        clean_value = re.sub(r'[^a-zA-Z0-9]', '_', value.upper())
+        clean_value = NON_ALNUM_PATTERN.sub('_', value.upper())
         
         field_mapping = {
             'TIME_BUDGETS': f'TIME_BUDGET_{clean_value}',
@@ -154,10 +150,10 @@ class FieldAutoFixer:
                     }
                 }
         
-        return yaml.dump({'dynamic_fields': missing_fields}, 
-                        default_flow_style=False, 
-                        allow_unicode=True, 
-                        indent=2)
+        return safe_dump({'dynamic_fields': missing_fields}, 
+                         default_flow_style=False, 
+                         allow_unicode=True, 
+                         indent=2)
     
     def _determine_field_type(self, value: str) -> str:
         """根据值确定字段类型"""
@@ -234,45 +230,76 @@ class FieldAutoFixer:
         results = {'files_processed': 0, 'replacements_made': 0}
         
         for file_path, findings in hardcoded_findings.items():
-            if self._apply_file_fixes(file_path, findings, dry_run):
+            replacements = self._apply_file_fixes(file_path, findings, dry_run)
+            if replacements is not None:
                 results['files_processed'] += 1
-                results['replacements_made'] += len(findings)
+                results['replacements_made'] += replacements
         
         return results
     
-    def _apply_file_fixes(self, file_path: str, findings: List[Dict], dry_run: bool) -> bool:
-        """对单个文件应用修复"""
+    @staticmethod
+    def _select_spans(content: str, findings: List[Dict]) -> List[Tuple[int, int, str]]:
+        """选出要替换的区间：按起始偏移排序，与已选区间重叠的发现（如 ≥70% 内的 70%）
+        以及偏移处文本已与扫描时不一致的过期发现被跳过"""
+        spans = []
+        taken_end = -1
+        for finding in sorted(findings, key=lambda x: (x['start'], -x['end'])):
+            start, end = finding['start'], finding['end']
+            if start < taken_end or content[start:end] != finding['hardcoded_value']:
+                continue
+            spans.append((start, end, finding['replacement_pattern']))
+            taken_end = end
+        return spans
+    
+    @staticmethod
+    def _rewrite_spans(content: str, spans: List[Tuple[int, int, str]]) -> str:
+        """单遍按区间切片拼接生成新内容，只改动指定区间"""
+        parts = []
+        position = 0
+        for start, end, replacement in spans:
+            parts.append(content[position:start])
+            parts.append(replacement)
+            position = end
+        parts.append(content[position:])
+        return ''.join(parts)
+    
+    def _apply_file_fixes(self, file_path: str, findings: List[Dict], dry_run: bool) -> Optional[int]:
+        """对单个文件应用修复，返回实际替换数（失败返回 None）
+        
+        发现记录携带扫描时的字符偏移（start/end），只替换这些精确区间，整个文件线性时间重写。
+        读写均不做换行转换：偏移与扫描时的内容一致，CRLF 等原有换行符原样保留。
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
                 content = f.read()
             
-            modified_content = content
-            
-            # 按行号倒序处理，避免行号偏移
-            sorted_findings = sorted(findings, key=lambda x: x['line_number'], reverse=True)
-            
-            for finding in sorted_findings:
-                old_value = finding['hardcoded_value']
-                new_value = finding['replacement_pattern']
-                
-                # 简单的字符串替换（可以改进为更精确的替换）
-                modified_content = modified_content.replace(old_value, new_value)
+            spans = self._select_spans(content, findings)
+            modified_content = self._rewrite_spans(content, spans)
             
-            if not dry_run:
+            if not dry_run and spans:
                 # 备份原文件
                 backup_path = f"{file_path}.backup"
-                with open(backup_path, 'w', encoding='utf-8') as f:
+                with open(backup_path, 'w', encoding='utf-8', newline='') as f:
                     f.write(content)
                 
                 # 写入修改后的内容
-                with open(file_path, 'w', encoding='utf-8') as f:
+                with open(file_path, 'w', encoding='utf-8', newline='') as f:
                     f.write(modified_content)
             
-            return True
+            return len(spans)
             
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
-            return False
+            return None
+
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='硬编码数值扫描与字段修复')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='并行扫描的进程数（默认1为串行，0为使用全部CPU核心）')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='每次派发给工作进程的文件数（默认自动计算，小文件很多时可调大）')
+    return parser.parse_args()
 
 def main():
     """主函数"""
@@ -280,8 +307,10 @@ def main():
     fields_yaml_path = "/Users/huijoohwee/Documents/999_sandbox/airvio/shared/fields/fields-s3out/fields.yaml"
     modules_dir = "/Users/huijoohwee/Documents/999_sandbox/airvio/modules"
     
+    args = parse_args()
+    
     # 创建修复器实例
-    fixer = FieldAutoFixer(fields_yaml_path, modules_dir)
+    fixer = FieldAutoFixer(fields_yaml_path, modules_dir, jobs=args.jobs, chunksize=args.chunksize)
     
     # 生成报告
     report = fixer.generate_report()
@@ -5,67 +5,213 @@
 功能：验证字段池配置的完整性、一致性和性能影响
 """
 
+import argparse
 import os
 import re
-import yaml
+import sys
 import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Any
-from dataclasses import dataclass
+from typing import Dict, List, Mapping, Set, Tuple, Any
 from datetime import datetime
 
-@dataclass
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from corpus_reader import REFERENCES, CorpusScan, FieldReference, extract_reference_locations, read_text, scan_corpus
+from field_pool import FieldPool
+from fs_watch import RESCAN, InotifyWatcher, create_watcher, watch_changes
+from lazy_field_pool import LazyFieldPool
+from reference_index import ReferenceIndex, ReferenceLocation, ReferenceResolver
+from report_writer import REPORT_FORMATS, ReportWriter, open_report
+from yaml_io import YAMLError, load_yaml_file
+
 class ValidationResult:
-    """验证结果数据类"""
-    level: str
-    status: str  # 'pass', 'warning', 'error'
-    message: str
-    file_path: str = ""
-    line_number: int = 0
-    suggestion: str = ""
+    """验证结果（__slots__ 省去逐实例 __dict__，大量结果时显著降低内存）"""
+    __slots__ = ('level', 'status', 'message', 'file_path', 'line_number', 'suggestion')
+    
+    def __init__(self, level: str, status: str, message: str, file_path: str = "",
+                 line_number: int = 0, suggestion: str = ""):
+        self.level = level
+        self.status = status  # 'pass', 'warning', 'error'
+        self.message = message
+        self.file_path = file_path
+        self.line_number = line_number
+        self.suggestion = suggestion
+    
+    def _astuple(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{self.__class__.__name__}({fields})'
+
+# 验证步骤依赖图：步骤 → 依赖的步骤；文档扫描不依赖字段注册表，可与结构验证并发
+VALIDATION_DAG = {
+    'scan': (),
+    'structure': (),
+    'performance': (),
+    'references': ('structure', 'scan'),
+    'syntax': ('structure',),
+    'consistency': ('references',),
+}
+# 结果合并顺序（与串行验证一致）
+VALIDATION_LEVELS = ('structure', 'references', 'syntax', 'consistency', 'performance')
+
+class LevelStream:
+    """按层级顺序流式写出并发产生的验证结果
+    
+    排在最前的未完成层级直接写出；其后的层级先暂存，待前面的层级全部完成后依次写出并转为直接写出。
+    输出顺序与串行验证一致，内存中只暂存尚未轮到的层级的结果。
+    """
+    
+    def __init__(self, levels, emit):
+        self._levels = list(levels)
+        self._emit = emit
+        self._head = 0
+        self._pending: Dict[str, List[ValidationResult]] = {level: [] for level in self._levels}
+        self._finished: Set[str] = set()
+        self._lock = threading.Lock()
+    
+    def write(self, level: str, result: ValidationResult):
+        with self._lock:
+            if self._head < len(self._levels) and self._levels[self._head] == level:
+                self._emit(result)
+            else:
+                self._pending[level].append(result)
+    
+    def finish(self, level: str):
+        """标记层级完成，写出随之轮到的层级已暂存的结果"""
+        with self._lock:
+            self._finished.add(level)
+            while self._head < len(self._levels) and self._levels[self._head] in self._finished:
+                self._head += 1
+                if self._head < len(self._levels):
+                    for result in self._pending.pop(self._levels[self._head]):
+                        self._emit(result)
+                    self._pending[self._levels[self._head]] = []
 
 class FieldPoolValidator:
     """字段池验证器主类"""
     
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, field_pool: FieldPool = None):
         self.config_path = config_path
         self.config = self._load_config()
+        self.field_pool = field_pool  # 注入的共享字段池；为 None 时从项目目录读取 fields.yaml
         self.results: List[ValidationResult] = []
-        self.field_registry: Dict[str, Any] = {}
+        self.field_registry: Mapping[str, Any] = {}
         self.reference_map: Dict[str, Set[str]] = {}
+        self.reference_index = ReferenceIndex()
+        self.reference_resolver = ReferenceResolver()
+        self._level_results = threading.local()
     
     def _load_config(self) -> Dict:
         """加载验证配置"""
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        return load_yaml_file(self.config_path)
     
-    def validate_all(self, project_root: str) -> List[ValidationResult]:
-        """执行完整验证流程"""
-        self.results.clear()
-        
-        # 1. 结构验证
-        self._validate_structure(project_root)
-        
-        # 2. 引用验证
-        self._validate_references(project_root)
+    def validate_all(self, project_root: str, corpus: CorpusScan = None, jobs: int = 4,
+                     reporter: ReportWriter = None, keep_results: bool = True) -> List[ValidationResult]:
+        """执行完整验证流程；corpus 为已扫描的模块语料（corpus_reader.scan_corpus），可与修复器共用
         
-        # 3. 语法验证
-        self._validate_syntax(project_root)
+        各验证层级按 VALIDATION_DAG 的依赖关系并发执行（jobs 为线程数，1 为串行），
+        结果按 VALIDATION_LEVELS 顺序合并，与串行执行逐条一致。
+        给定 reporter（report_writer.open_report）时结果在产生时即写出（见 LevelStream）；
+        keep_results 为 False 时写出后即丢弃，不在 self.results 中保留。
+        """
+        self.results.clear()
+        if reporter is not None:
+            def emit(result: ValidationResult):
+                reporter.write(result)
+                if keep_results:
+                    self.results.append(result)
+            stream = LevelStream(VALIDATION_LEVELS, emit)
+            level_step = lambda level, check, *args: self._stream_level(stream, level, check, *args)
+        else:
+            level_step = lambda level, check, *args: self._run_level(check, *args)
         
-        # 4. 一致性验证
-        self._validate_consistency(project_root)
+        steps = {
+            'scan': lambda: self._scan_modules(project_root, corpus),
+            'structure': lambda: level_step('structure', self._validate_structure, project_root),
+            'references': lambda: level_step('references', self._validate_references, project_root, outputs['scan']),
+            'syntax': lambda: level_step('syntax', self._validate_syntax, project_root),
+            'consistency': lambda: level_step('consistency', self._validate_consistency, project_root),
+            'performance': lambda: level_step('performance', self._validate_performance, project_root),
+        }
+        outputs: Dict[str, Any] = {}
+        pending = dict(VALIDATION_DAG)
+        emitted = 0
         
-        # 5. 性能验证
-        self._validate_performance(project_root)
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            running = {}
+            while pending or running:
+                for step, dependencies in list(pending.items()):
+                    if all(dependency in outputs for dependency in dependencies):
+                        running[executor.submit(steps[step])] = step
+                        del pending[step]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outputs[running.pop(future)] = future.result()
+                
+                if reporter is not None:
+                    continue
+                while emitted < len(VALIDATION_LEVELS) and VALIDATION_LEVELS[emitted] in outputs:
+                    level_results = outputs[VALIDATION_LEVELS[emitted]]
+                    outputs[VALIDATION_LEVELS[emitted]] = None
+                    if keep_results:
+                        self.results.extend(level_results)
+                    emitted += 1
         
         return self.results
     
+    def _report(self, result: ValidationResult):
+        """记录验证结果：在 _run_level / _stream_level 中运行时交给当前层级的接收函数，否则写入汇总列表"""
+        sink = getattr(self._level_results, 'sink', None)
+        if sink is None:
+            self.results.append(result)
+        else:
+            sink(result)
+    
+    def _run_level(self, check, *args) -> List[ValidationResult]:
+        """运行单个验证步骤并返回其产生的结果（线程内隔离，不影响汇总结果列表）"""
+        results = []
+        self._level_results.sink = results.append
+        try:
+            check(*args)
+        finally:
+            self._level_results.sink = None
+        return results
+    
+    def _stream_level(self, stream: 'LevelStream', level: str, check, *args):
+        """运行单个验证步骤，结果产生时即交给 stream 按层级顺序写出"""
+        self._level_results.sink = lambda result: stream.write(level, result)
+        try:
+            check(*args)
+        finally:
+            self._level_results.sink = None
+            stream.finish(level)
+    
+    def _scan_modules(self, project_root: str, corpus: CorpusScan = None) -> CorpusScan:
+        """读取模块文档并提取引用（不依赖字段注册表，可与结构验证并发）"""
+        if corpus is None or corpus.get(REFERENCES) is None:
+            modules_dir = Path(project_root) / "airvio/modules"
+            corpus = scan_corpus(modules_dir, {REFERENCES: extract_reference_locations})
+        return corpus
+    
     def _validate_structure(self, project_root: str):
         """验证字段池文件结构"""
         fields_file = Path(project_root) / "airvio/shared/fields/fields-s3out/fields.yaml"
+        if self.field_pool is not None:
+            fields_file = self.field_pool.source or fields_file
         
-        if not fields_file.exists():
-            self.results.append(ValidationResult(
+        if not (self.field_pool.available if self.field_pool is not None else fields_file.exists()):
+            self._report(ValidationResult(
                 level="structure",
                 status="error",
                 message="字段池文件不存在",
@@ -75,28 +221,20 @@ class FieldPoolValidator:
             return
         
         try:
-            with open(fields_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            # 延迟加载：根节点检查只需键索引，字段条目在属性检查时逐个解析（注入的共享字段池直接复用）
+            field_pool = self.field_pool if self.field_pool is not None else LazyFieldPool(fields_file)
+            root_keys = field_pool.root_keys
             
             # 检查根节点
-            required_roots = self.config['validation_config']['rules']['structure']['required_root_nodes']
-            for root in required_roots:
-                if root not in data:
-                    self.results.append(ValidationResult(
-                        level="structure",
-                        status="error",
-                        message=f"缺少必需的根节点: {root}",
-                        file_path=str(fields_file),
-                        suggestion=f"请在文件开头添加 '{root}:' 节点"
-                    ))
+            self._validate_root_nodes(root_keys, str(fields_file))
             
             # 检查字段属性完整性
-            if 'dynamic_fields' in data:
-                self._validate_field_properties(data['dynamic_fields'], str(fields_file))
-                self.field_registry = data['dynamic_fields']
+            if 'dynamic_fields' in root_keys:
+                self._validate_field_properties(field_pool, str(fields_file))
+                self.field_registry = field_pool
             
-        except yaml.YAMLError as e:
-            self.results.append(ValidationResult(
+        except YAMLError as e:
+            self._report(ValidationResult(
                 level="structure",
                 status="error",
                 message=f"YAML 解析错误: {str(e)}",
@@ -104,7 +242,20 @@ class FieldPoolValidator:
                 suggestion="请检查 YAML 语法格式"
             ))
     
-    def _validate_field_properties(self, fields: Dict, file_path: str):
+    def _validate_root_nodes(self, root_keys: List[str], file_path: str):
+        """检查必需的根节点"""
+        required_roots = self.config['validation_config']['rules']['structure']['required_root_nodes']
+        for root in required_roots:
+            if root not in root_keys:
+                self._report(ValidationResult(
+                    level="structure",
+                    status="error",
+                    message=f"缺少必需的根节点: {root}",
+                    file_path=file_path,
+                    suggestion=f"请在文件开头添加 '{root}:' 节点"
+                ))
+    
+    def _validate_field_properties(self, fields: Mapping, file_path: str):
         """验证字段属性完整性"""
         required_props = self.config['validation_config']['rules']['structure']['required_field_properties']
         
@@ -114,7 +265,7 @@ class FieldPoolValidator:
                 
             for prop in required_props:
                 if prop not in field_data:
-                    self.results.append(ValidationResult(
+                    self._report(ValidationResult(
                         level="structure",
                         status="warning",
                         message=f"字段 {field_name} 缺少属性: {prop}",
@@ -122,96 +273,96 @@ class FieldPoolValidator:
                         suggestion=f"请为字段 {field_name} 添加 {prop} 属性"
                     ))
     
-    def _validate_references(self, project_root: str):
+    def _validate_references(self, project_root: str, corpus: CorpusScan = None):
         """验证字段引用完整性"""
-        modules_dir = Path(project_root) / "airvio/modules"
-        reference_pattern = re.compile(r'\{\{dynamic_fields\.([A-Z_]+(?:\.[a-z_]+)*)\}\}')
+        corpus = self._scan_modules(project_root, corpus)
+        references_by_file = corpus.get(REFERENCES)
         
-        for md_file in modules_dir.rglob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # 查找所有字段引用
-                references = reference_pattern.findall(content)
-                
-                for ref in references:
-                    self._validate_single_reference(ref, str(md_file))
-                    
-                    # 记录引用关系
-                    if str(md_file) not in self.reference_map:
-                        self.reference_map[str(md_file)] = set()
-                    self.reference_map[str(md_file)].add(ref)
-                        
-            except Exception as e:
-                self.results.append(ValidationResult(
+        for md_file in corpus.files:
+            if md_file in corpus.errors:
+                self._report(ValidationResult(
                     level="reference",
                     status="error",
-                    message=f"读取文件失败: {str(e)}",
+                    message=f"读取文件失败: {corpus.errors[md_file]}",
                     file_path=str(md_file)
                 ))
+                continue
+            
+            self._validate_file_references(str(md_file), references_by_file[md_file])
+    
+    def _validate_file_references(self, file_path: str, references: List[FieldReference]):
+        """验证单个文档中的全部引用并记录引用关系"""
+        for ref in references:
+            self._validate_single_reference(ref.path, file_path)
+            
+            # 记录引用关系
+            if file_path not in self.reference_map:
+                self.reference_map[file_path] = set()
+            self.reference_map[file_path].add(ref.path)
+        
+        self.reference_index.set_file(file_path, references)
     
     def _validate_single_reference(self, ref_path: str, file_path: str):
-        """验证单个字段引用"""
-        parts = ref_path.split('.')
-        field_name = parts[0]
+        """验证单个字段引用（解析结果按路径前缀缓存，注册表更换或共享字段池内容更新时自动失效）"""
+        generation = getattr(self.field_registry, 'generation', 0)
+        if self.reference_resolver.registry is not self.field_registry or self.reference_resolver.generation != generation:
+            self.reference_resolver.reset(self.field_registry, generation)
+        failure = self.reference_resolver.resolve(ref_path)
+        if failure is None:
+            return
         
-        # 检查字段是否存在
-        if field_name not in self.field_registry:
-            self.results.append(ValidationResult(
+        kind, failed_path = failure
+        field_name = failed_path.split('.')[0]
+        if kind == 'field':
+            # 字段不存在
+            self._report(ValidationResult(
                 level="reference",
                 status="error",
                 message=f"引用的字段不存在: {field_name}",
                 file_path=file_path,
                 suggestion=f"请检查字段名拼写或在字段池中添加字段 {field_name}"
             ))
-            return
-        
-        # 检查嵌套属性路径
-        if len(parts) > 1:
-            current = self.field_registry[field_name]
-            for i, part in enumerate(parts[1:], 1):
-                if not isinstance(current, dict) or part not in current:
-                    self.results.append(ValidationResult(
-                        level="reference",
-                        status="error",
-                        message=f"引用路径不存在: {'.'.join(parts[:i+1])}",
-                        file_path=file_path,
-                        suggestion=f"请检查字段 {field_name} 的属性结构"
-                    ))
-                    return
-                current = current[part]
+        else:
+            # 嵌套属性路径不存在
+            self._report(ValidationResult(
+                level="reference",
+                status="error",
+                message=f"引用路径不存在: {failed_path}",
+                file_path=file_path,
+                suggestion=f"请检查字段 {field_name} 的属性结构"
+            ))
     
     def _validate_syntax(self, project_root: str):
         """验证语法规范"""
         field_pattern = re.compile(self.config['validation_config']['rules']['syntax']['field_naming_convention'])
         
         for field_name in self.field_registry.keys():
-            if not field_pattern.match(field_name):
-                self.results.append(ValidationResult(
-                    level="syntax",
-                    status="warning",
-                    message=f"字段名不符合命名规范: {field_name}",
-                    suggestion="字段名应使用大写字母和下划线，如 FIELD_NAME"
-                ))
+            self._validate_field_name(field_name, field_pattern)
+    
+    def _validate_field_name(self, field_name: str, field_pattern: re.Pattern):
+        """验证单个字段名的命名规范"""
+        if not field_pattern.match(field_name):
+            self._report(ValidationResult(
+                level="syntax",
+                status="warning",
+                message=f"字段名不符合命名规范: {field_name}",
+                suggestion="字段名应使用大写字母和下划线，如 FIELD_NAME"
+            ))
     
     def _validate_consistency(self, project_root: str):
         """验证一致性"""
-        # 检查孤立字段
-        used_fields = set()
-        for refs in self.reference_map.values():
-            for ref in refs:
-                field_name = ref.split('.')[0]
-                used_fields.add(field_name)
-        
-        for field_name in self.field_registry.keys():
-            if field_name not in used_fields:
-                self.results.append(ValidationResult(
-                    level="consistency",
-                    status="warning",
-                    message=f"未使用的字段: {field_name}",
-                    suggestion="考虑删除未使用的字段或添加相应引用"
-                ))
+        # 检查孤立字段（反向索引查找）
+        for field_name in self.reference_index.orphans(self.field_registry.keys()):
+            self._report(ValidationResult(
+                level="consistency",
+                status="warning",
+                message=f"未使用的字段: {field_name}",
+                suggestion="考虑删除未使用的字段或添加相应引用"
+            ))
+    
+    def impact_of(self, field_name: str) -> List[ReferenceLocation]:
+        """改名或删除字段时受影响的引用位置（需先完成引用验证）"""
+        return self.reference_index.impact(field_name)
     
     def _validate_performance(self, project_root: str):
         """验证性能影响"""
@@ -220,75 +371,270 @@ class FieldPoolValidator:
         if fields_file.exists():
             file_size = fields_file.stat().st_size
             if file_size > 1024 * 1024:  # 1MB
-                self.results.append(ValidationResult(
+                self._report(ValidationResult(
                     level="performance",
                     status="warning",
                     message=f"字段池文件过大: {file_size / 1024 / 1024:.2f}MB",
                     suggestion="考虑拆分字段池或优化字段定义"
                 ))
     
-    def generate_report(self, output_path: str):
-        """生成验证报告"""
-        report = {
-            "timestamp": datetime.now().isoformat(),
-            "summary": {
-                "total_checks": len(self.results),
-                "errors": len([r for r in self.results if r.status == "error"]),
-                "warnings": len([r for r in self.results if r.status == "warning"]),
-                "passed": len([r for r in self.results if r.status == "pass"])
-            },
-            "details": [
-                {
-                    "level": r.level,
-                    "status": r.status,
-                    "message": r.message,
-                    "file_path": r.file_path,
-                    "line_number": r.line_number,
-                    "suggestion": r.suggestion
-                }
-                for r in self.results
-            ]
-        }
+    def generate_report(self, output_path: str, report_format: str = 'json') -> Dict[str, int]:
+        """生成验证报告（逐条流式写出，汇总在末尾），返回汇总计数"""
+        with open_report(output_path, report_format) as reporter:
+            reporter.write_all(self.results)
+        return reporter.summary
+
+class IncrementalFieldValidator(FieldPoolValidator):
+    """常驻增量验证器（watch 模式，对应配置中的 on_file_save 触发条件）
+    
+    在内存中保持字段注册表、各文档的引用列表以及按来源分组的验证结果：
+    文档变化时只重新读取并验证该文档的引用；fields.yaml 变化时按条目原始字节比较，
+    只重新验证内容变化的字段以及引用了这些字段的文档。一致性与性能检查只依赖内存状态，每次重新汇总。
+    """
+    
+    def __init__(self, config_path: str, project_root: str):
+        super().__init__(config_path)
+        self.project_root = str(Path(project_root).absolute())
+        self.fields_file = Path(self.project_root) / "airvio/shared/fields/fields-s3out/fields.yaml"
+        self.modules_dir = Path(self.project_root) / "airvio/modules"
+        self.field_pattern = re.compile(self.config['validation_config']['rules']['syntax']['field_naming_convention'])
+        self.field_pool = LazyFieldPool(self.fields_file)
+        self.field_entries: Dict[str, bytes] = {}
+        self.structure_results: List[ValidationResult] = []
+        self.property_results: Dict[str, List[ValidationResult]] = {}
+        self.syntax_results: Dict[str, List[ValidationResult]] = {}
+        self.file_references: Dict[str, List[FieldReference]] = {}
+        self.file_results: Dict[str, List[ValidationResult]] = {}
+    
+    def _structure_error(self, message: str, suggestion: str) -> ValidationResult:
+        return ValidationResult(
+            level="structure",
+            status="error",
+            message=message,
+            file_path=str(self.fields_file),
+            suggestion=suggestion
+        )
+    
+    def refresh_fields(self) -> Set[str]:
+        """重新索引 fields.yaml，只重新验证内容变化的字段，返回变化（含新增、删除）的字段名"""
+        self.field_pool.reload()
+        self.structure_results = []
+        entries: Dict[str, bytes] = {}
+        
+        if not self.fields_file.exists():
+            self.structure_results.append(self._structure_error("字段池文件不存在", "请确保字段池文件存在于正确路径"))
+        else:
+            root_keys = self.field_pool.root_keys
+            self.structure_results = self._run_level(self._validate_root_nodes, root_keys, str(self.fields_file))
+            if 'dynamic_fields' in root_keys:
+                entries = self.field_pool.raw_entries()
+        
+        changed = {name for name in entries.keys() | self.field_entries.keys()
+                   if entries.get(name) != self.field_entries.get(name)}
+        self.field_entries = entries
+        self.field_registry = self.field_pool if entries else {}
+        self.reference_resolver.invalidate(changed)
+        
+        for field_name in changed:
+            self.property_results.pop(field_name, None)
+            self.syntax_results.pop(field_name, None)
+            if field_name not in entries:
+                continue
+            try:
+                self.property_results[field_name] = self._run_level(
+                    self._validate_field_properties, {field_name: self.field_pool[field_name]}, str(self.fields_file))
+            except YAMLError as e:
+                self.structure_results.append(self._structure_error(f"YAML 解析错误: {str(e)}", "请检查 YAML 语法格式"))
+            self.syntax_results[field_name] = self._run_level(self._validate_field_name, field_name, self.field_pattern)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
+        # 重新验证引用了变化字段的文档（由反向索引定位，引用列表已在内存中，无需重新读取）
+        affected = {file_path for field_name in changed for file_path in self.reference_index.files_referencing(field_name)}
+        for file_path in affected:
+            references = self.file_references[file_path]
+            self.file_results[file_path] = self._run_level(self._validate_file_references, file_path, references)
+        
+        return changed
+    
+    def refresh_file(self, md_file: Path, content: str = None):
+        """重新读取并验证单个文档的引用；文档已删除时移除其引用与结果"""
+        file_path = str(md_file)
+        self.reference_map.pop(file_path, None)
+        
+        if content is None:
+            if not md_file.exists():
+                self.file_references.pop(file_path, None)
+                self.file_results.pop(file_path, None)
+                self.reference_index.remove_file(file_path)
+                return
+            try:
+                content = read_text(md_file)
+            except Exception as e:
+                self.file_references[file_path] = []
+                self.reference_index.remove_file(file_path)
+                self.file_results[file_path] = [ValidationResult(
+                    level="reference",
+                    status="error",
+                    message=f"读取文件失败: {str(e)}",
+                    file_path=file_path
+                )]
+                return
+        
+        references = extract_reference_locations(content)
+        self.file_references[file_path] = references
+        self.file_results[file_path] = self._run_level(self._validate_file_references, file_path, references)
+    
+    def _assemble(self):
+        """按完整验证的顺序汇总各来源的结果"""
+        results = list(self.structure_results)
+        for field_name in self.field_entries:
+            results.extend(self.property_results.get(field_name, ()))
+        for file_path in sorted(self.file_results, key=Path):
+            results.extend(self.file_results[file_path])
+        for field_name in self.field_entries:
+            results.extend(self.syntax_results.get(field_name, ()))
+        results.extend(self._run_level(self._validate_consistency, self.project_root))
+        results.extend(self._run_level(self._validate_performance, self.project_root))
+        self.results = results
+    
+    def load(self) -> List[ValidationResult]:
+        """首次完整加载并验证"""
+        self.refresh_fields()
+        corpus = scan_corpus(self.modules_dir, {REFERENCES: extract_reference_locations})
+        for md_file in corpus.files:
+            if md_file in corpus.errors:
+                self.refresh_file(md_file)
+            else:
+                references = corpus.get(REFERENCES)[md_file]
+                self.file_references[str(md_file)] = references
+                self.file_results[str(md_file)] = self._run_level(self._validate_file_references, str(md_file), references)
+        self._assemble()
+        return self.results
+    
+    def apply_changes(self, changed_paths: Set[Path]) -> List[ValidationResult]:
+        """处理一批变化的文件，返回这些文件（及受影响字段）重新产生的结果"""
+        touched: List[ValidationResult] = []
+        if self.fields_file in changed_paths:
+            changed_fields = self.refresh_fields()
+            touched.extend(self.structure_results)
+            for field_name in changed_fields:
+                touched.extend(self.property_results.get(field_name, ()))
+                touched.extend(self.syntax_results.get(field_name, ()))
+        for path in sorted(changed_paths):
+            if path != self.fields_file and path.suffix == '.md':
+                self.refresh_file(path)
+                touched.extend(self.file_results.get(str(path), ()))
+        self._assemble()
+        return touched
+    
+    def rescan(self) -> List[ValidationResult]:
+        """完整重新扫描：fields.yaml、已知文档与磁盘上现有文档全部视为变化（已删除的文档随之移除）"""
+        changed_paths = {Path(file_path) for file_path in self.file_references}
+        changed_paths.update(Path(md_file).absolute() for md_file in self.modules_dir.rglob('*.md'))
+        changed_paths.add(self.fields_file)
+        return self.apply_changes(changed_paths)
+    
+    def watch(self, interval: float = 0.5):
+        """监听 modules/ 与 fields.yaml，变化时增量验证并输出结果
+        
+        单批处理失败（如 fields.yaml 保存到一半的 YAML 错误）只报告，继续监听；
+        监听事件丢失时完整重新扫描。
+        """
+        watcher = create_watcher([self.modules_dir], [self.fields_file])
+        print(f"监听中（{'inotify' if isinstance(watcher, InotifyWatcher) else '轮询'}）: {self.modules_dir}, {self.fields_file}")
+        try:
+            for changed_paths in watch_changes(watcher, interval):
+                started = time.perf_counter()
+                try:
+                    if changed_paths is RESCAN:
+                        print(f"[{datetime.now():%H:%M:%S}] 监听事件队列溢出，完整重新扫描")
+                        touched = self.rescan()
+                        changed_paths = set(self.file_references)
+                    else:
+                        touched = self.apply_changes(changed_paths)
+                except Exception as e:
+                    print(f"[{datetime.now():%H:%M:%S}] 增量验证失败: {e}（继续监听，文件再次保存后重试）")
+                    continue
+                elapsed = (time.perf_counter() - started) * 1000
+                
+                errors = len([r for r in self.results if r.status == "error"])
+                warnings = len([r for r in self.results if r.status == "warning"])
+                print(f"[{datetime.now():%H:%M:%S}] {len(changed_paths)} 个文件变化，"
+                      f"增量验证 {elapsed:.1f}ms: {errors} 个错误, {warnings} 个警告")
+                for result in touched:
+                    if result.status == "error":
+                        print(f"  - {result.message} ({result.file_path})")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
 
 def main():
     """主函数"""
-    import sys
+    parser = argparse.ArgumentParser(description='字段池配置自动化验证器')
+    parser.add_argument('project_root', help='项目根目录（包含 airvio/ 的目录）')
+    parser.add_argument('--watch', action='store_true',
+                        help='完整验证后持续监听 modules/ 与 fields.yaml，文件保存时增量验证')
+    parser.add_argument('--interval', type=float, default=0.5,
+                        help='监听轮询间隔秒数（inotify 不可用时生效）')
+    parser.add_argument('--jobs', '-j', type=int, default=4,
+                        help='并发执行验证层级的线程数（1为串行）')
+    parser.add_argument('--impact', nargs='+', metavar='FIELD',
+                        help='只输出改名或删除这些字段时受影响的引用位置')
+    parser.add_argument('--report', metavar='PATH',
+                        help='报告输出路径（默认 airvio/shared/fields/validation-report.json，以 .gz 结尾时压缩）')
+    parser.add_argument('--report-format', choices=REPORT_FORMATS, default='json',
+                        help='报告格式：json 单个文档，ndjson 逐行记录，compact 紧凑编码的逐行记录')
+    parser.add_argument('--max-lines', type=int, default=200,
+                        help='终端摘要中错误、警告各最多列出的条数（完整结果见报告）')
+    args = parser.parse_args()
     
-    if len(sys.argv) != 2:
-        print("用法: python field-validator.py <project_root>")
-        sys.exit(1)
-    
-    project_root = sys.argv[1]
+    project_root = args.project_root
     config_path = os.path.join(project_root, "airvio/shared/utils/field-validation-config.yaml")
     
+    if args.watch:
+        validator = IncrementalFieldValidator(config_path, project_root)
+        results = validator.load()
+        errors = [r for r in results if r.status == "error"]
+        warnings = [r for r in results if r.status == "warning"]
+        print(f"验证完成: {len(errors)} 个错误, {len(warnings)} 个警告")
+        validator.watch(args.interval)
+        return
+    
     validator = FieldPoolValidator(config_path)
-    results = validator.validate_all(project_root)
     
-    # 生成报告
-    report_path = os.path.join(project_root, "airvio/shared/fields/validation-report.json")
-    validator.generate_report(report_path)
+    if args.impact:
+        validator.validate_all(project_root, jobs=args.jobs, keep_results=False)
+        for field_name in args.impact:
+            locations = validator.impact_of(field_name)
+            print(f"{field_name}: {len(locations)} 处引用")
+            for location in locations:
+                print(f"  - {location.file_path}:{location.line_number}  {{{{dynamic_fields.{location.path}}}}}")
+        return
     
-    # 输出摘要
-    errors = [r for r in results if r.status == "error"]
-    warnings = [r for r in results if r.status == "warning"]
+    # 验证的同时流式生成报告，不在内存中保留结果；摘要取自写入器的计数与前 N 条样本
+    report_path = args.report or os.path.join(project_root, "airvio/shared/fields/validation-report.json")
+    with open_report(report_path, args.report_format, max_samples=args.max_lines) as reporter:
+        validator.validate_all(project_root, jobs=args.jobs, reporter=reporter, keep_results=False)
+    summary = reporter.summary
     
-    print(f"验证完成: {len(errors)} 个错误, {len(warnings)} 个警告")
-    
-    if errors:
-        print("\n错误:")
-        for error in errors:
-            print(f"  - {error.message} ({error.file_path})")
+    # 输出摘要
+    print(f"验证完成: {summary['errors']} 个错误, {summary['warnings']} 个警告")
+    resolver_stats = validator.reference_resolver.stats()
+    print(f"引用解析缓存: 命中 {resolver_stats['hits']} / 未命中 {resolver_stats['misses']} "
+          f"(命中率 {resolver_stats['hit_rate']:.1%})")
     
-    if warnings:
-        print("\n警告:")
-        for warning in warnings:
-            print(f"  - {warning.message} ({warning.file_path})")
+    for status, title, counter in (("error", "错误", "errors"), ("warning", "警告", "warnings")):
+        samples = reporter.samples[status]
+        if not samples:
+            continue
+        print(f"\n{title}:")
+        for result in samples:
+            print(f"  - {result.message} ({result.file_path})")
+        if summary[counter] > len(samples):
+            print(f"  ... 另有 {summary[counter] - len(samples)} 条，详见 {report_path}")
     
     # 返回适当的退出码
-    sys.exit(1 if errors else 0)
+    sys.exit(1 if summary['errors'] else 0)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
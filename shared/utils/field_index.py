@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字段列式索引
+将合并后的字段池导出为可内存映射的列式二进制文件（每个字段一行），并提供聚合查询接口
+安装了 NumPy 时查询走向量化计算，否则回退到标准库 memoryview 逐行计算
+
+文件布局：MAGIC(8) | 头部长度(<Q) | JSON头部(8字节对齐) | 各列原始数据块(8字节对齐)
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b'AIRVCOL1'
+FORMAT_VERSION = 1
+
+# 分类列：以 uint8 编码存储，编码 0 表示缺失值
+CATEGORICAL_COLUMNS = ('priority', 'ai_collaboration', 'startup_phase', 'value_chain_position')
+# 数值列：列名 → array 类型码
+NUMERIC_COLUMNS = {'estimated_tokens': 'd', 'is_mvp_critical': 'B'}
+# 标签位图：每行 tag_words 个 uint64
+TAGS_COLUMN = 'tags'
+
+NUMPY_DTYPES = {'B': 'u1', 'd': 'f8', 'Q': 'u8'}
+
+
+def _align(size: int) -> int:
+    """向上对齐到8字节"""
+    return (size + 7) & ~7
+
+
+def write_field_index(index_file: Union[str, Path], rows: Iterable[Tuple[str, Dict[str, Any]]],
+                      categories: Dict[str, List[str]] = None) -> int:
+    """写出列式索引，返回行数
+
+    rows 为 (字段名, 列值字典) 序列，列值字典包含分类列、数值列以及 tags 列表；
+    categories 预置各分类列的取值顺序，使编码在多次运行间保持稳定。
+    """
+    lookups = {}
+    for column in CATEGORICAL_COLUMNS:
+        labels = [None] + list((categories or {}).get(column, []))
+        lookups[column] = {label: code for code, label in enumerate(labels)}
+
+    tag_lookup: Dict[str, int] = {}
+    names = bytearray()
+    name_offsets = array('Q', [0])
+    codes = {column: array('B') for column in CATEGORICAL_COLUMNS}
+    numbers = {column: array(type_code) for column, type_code in NUMERIC_COLUMNS.items()}
+    tag_masks: List[int] = []
+
+    for field_name, values in rows:
+        names.extend(field_name.encode('utf-8'))
+        name_offsets.append(len(names))
+
+        for column in CATEGORICAL_COLUMNS:
+            lookup = lookups[column]
+            label = values.get(column)
+            if label not in lookup:
+                if len(lookup) > 255:
+                    raise ValueError(f"分类列 {column} 取值超过255种")
+                lookup[label] = len(lookup)
+            codes[column].append(lookup[label])
+
+        numbers['estimated_tokens'].append(float(values.get('estimated_tokens') or 0))
+        numbers['is_mvp_critical'].append(1 if values.get('is_mvp_critical') else 0)
+
+        mask = 0
+        for tag in values.get(TAGS_COLUMN) or ():
+            mask |= 1 << tag_lookup.setdefault(tag, len(tag_lookup))
+        tag_masks.append(mask)
+
+    tag_words = max(1, (len(tag_lookup) + 63) // 64)
+    tags = array('Q', (mask >> (64 * word) & 0xFFFFFFFFFFFFFFFF
+                       for mask in tag_masks for word in range(tag_words)))
+
+    blocks = [('field_name_offsets', name_offsets), ('field_names', array('B', bytes(names))), (TAGS_COLUMN, tags)]
+    blocks += [(column, codes[column]) for column in CATEGORICAL_COLUMNS]
+    blocks += [(column, numbers[column]) for column in NUMERIC_COLUMNS]
+
+    columns = {}
+    offset = 0
+    for column, data in blocks:
+        columns[column] = {'format': data.typecode, 'offset': offset, 'length': len(data)}
+        offset = _align(offset + len(data) * data.itemsize)
+
+    header = json.dumps({
+        'version': FORMAT_VERSION,
+        'rows': len(tag_masks),
+        'byteorder': sys.byteorder,
+        'tag_words': tag_words,
+        'tags': sorted(tag_lookup, key=tag_lookup.get),
+        'categories': {column: sorted(lookup, key=lookup.get) for column, lookup in lookups.items()},
+        'columns': columns
+    }, ensure_ascii=False).encode('utf-8')
+    header += b' ' * (_align(len(MAGIC) + 8 + len(header)) - len(MAGIC) - 8 - len(header))
+
+    index_file = Path(index_file)
+    tmp_file = index_file.with_name(index_file.name + '.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for column, data in blocks:
+            raw = data.tobytes()
+            f.write(raw)
+            f.write(b'\0' * (_align(len(raw)) - len(raw)))
+    os.replace(tmp_file, index_file)
+
+    return len(tag_masks)
+
+
+class FieldIndex:
+    """列式字段索引（只读、内存映射）
+
+    查询示例 - P0 且 MVP 关键字段按创业阶段汇总 Token 预算：
+        with FieldIndex(path) as index:
+            index.aggregate('estimated_tokens', by='startup_phase',
+                            where={'priority': 'P0', 'is_mvp_critical': True})
+
+    where 条件：分类列取单个值或值列表；数值列按相等比较；tags 取单个标签或标签列表（需全部包含）。
+    """
+
+    def __init__(self, index_file: Union[str, Path]):
+        self.index_file = Path(index_file)
+        self._file = open(self.index_file, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"不是字段列式索引文件: {self.index_file}")
+        (header_len,) = struct.unpack_from('<Q', self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(self._mmap[header_start:header_start + header_len].decode('utf-8'))
+        if self.header['byteorder'] != sys.byteorder:
+            self.close()
+            raise ValueError("索引文件字节序与当前平台不一致，请重新生成")
+
+        self._data_start = header_start + header_len
+        self.rows: int = self.header['rows']
+        self.tags: List[str] = self.header['tags']
+        self.categories: Dict[str, List[Optional[str]]] = self.header['categories']
+        self._columns: Dict[str, Any] = {}
+
+    def __enter__(self) -> 'FieldIndex':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def close(self):
+        """释放内存映射"""
+        self._columns.clear()
+        if not self._mmap.closed:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # 仍有外部引用的列视图，随其回收
+        self._file.close()
+
+    def column(self, name: str):
+        """返回列数据：有 NumPy 时为 ndarray，否则为 memoryview（均为零拷贝）"""
+        if name not in self._columns:
+            spec = self.header['columns'][name]
+            offset = self._data_start + spec['offset']
+            if np is not None:
+                data = np.frombuffer(self._mmap, dtype=NUMPY_DTYPES[spec['format']],
+                                     count=spec['length'], offset=offset)
+                if name == TAGS_COLUMN:
+                    data = data.reshape(self.rows, self.header['tag_words'])
+            else:
+                size = struct.calcsize(spec['format']) * spec['length']
+                data = memoryview(self._mmap)[offset:offset + size].cast(spec['format'])
+            self._columns[name] = data
+        return self._columns[name]
+
+    def field_names(self) -> List[str]:
+        """按行顺序返回字段名"""
+        offsets = self.column('field_name_offsets')
+        names = bytes(self.column('field_names'))
+        return [names[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(self.rows)]
+
+    def labels(self, name: str) -> List[Optional[str]]:
+        """按行解码分类列"""
+        categories = self.categories[name]
+        return [categories[code] for code in self.column(name)]
+
+    def _category_codes(self, name: str, values) -> List[int]:
+        if not isinstance(values, (list, tuple, set, frozenset)):
+            values = [values]
+        categories = self.categories[name]
+        return [categories.index(value) for value in values if value in categories]
+
+    def _tag_bits(self, values) -> Optional[List[Tuple[int, int]]]:
+        if isinstance(values, str):
+            values = [values]
+        bits = []
+        for tag in values:
+            if tag not in self.tags:
+                return None
+            position = self.tags.index(tag)
+            bits.append((position // 64, 1 << (position % 64)))
+        return bits
+
+    def mask(self, where: Dict[str, Any] = None):
+        """计算满足条件的行：NumPy 下为布尔数组，否则为行号列表"""
+        where = where or {}
+        if np is not None:
+            selected = np.ones(self.rows, dtype=bool)
+            for name, condition in where.items():
+                if name == TAGS_COLUMN:
+                    bits = self._tag_bits(condition)
+                    if bits is None:
+                        return np.zeros(self.rows, dtype=bool)
+                    tags = self.column(TAGS_COLUMN)
+                    for word, bit in bits:
+                        selected &= (tags[:, word] & np.uint64(bit)) != 0
+                elif name in self.categories:
+                    selected &= np.isin(self.column(name), self._category_codes(name, condition))
+                else:
+                    selected &= self.column(name) == condition
+            return selected
+
+        predicates = []
+        for name, condition in where.items():
+            if name == TAGS_COLUMN:
+                bits = self._tag_bits(condition)
+                if bits is None:
+                    return []
+                tags, words = self.column(TAGS_COLUMN), self.header['tag_words']
+                predicates.append(lambda i, tags=tags, words=words, bits=bits:
+                                  all(tags[i * words + word] & bit for word, bit in bits))
+            elif name in self.categories:
+                column, codes = self.column(name), frozenset(self._category_codes(name, condition))
+                predicates.append(lambda i, column=column, codes=codes: column[i] in codes)
+            else:
+                column = self.column(name)
+                predicates.append(lambda i, column=column, condition=condition: column[i] == condition)
+        return [i for i in range(self.rows) if all(predicate(i) for predicate in predicates)]
+
+    def aggregate(self, value: str = None, by: str = None, where: Dict[str, Any] = None):
+        """聚合查询：value 为空时计数，否则对数值列求和；by 为分类列时按类别分组返回字典"""
+        selected = self.mask(where)
+
+        if np is not None:
+            weights = self.column(value)[selected].astype('f8') if value else None
+            if by is None:
+                return float(weights.sum()) if value else int(selected.sum())
+            codes = self.column(by)[selected]
+            categories = self.categories[by]
+            counts = np.bincount(codes, minlength=len(categories))
+            totals = np.bincount(codes, weights=weights, minlength=len(categories)) if value else counts
+            return {categories[code]: (float(totals[code]) if value else int(totals[code]))
+                    for code in np.flatnonzero(counts)}
+
+        values = self.column(value) if value else None
+        if by is None:
+            return float(sum(values[i] for i in selected)) if value else len(selected)
+        codes, categories = self.column(by), self.categories[by]
+        result = {}
+        for i in selected:
+            label = categories[codes[i]]
+            result[label] = result.get(label, 0) + (values[i] if value else 1)
+        return {label: (float(total) if value else total) for label, total in result.items()}
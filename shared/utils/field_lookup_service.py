@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字段池常驻查询服务
+一次加载合并后的字段池，预计算 点分路径 → 值 的扁平查找表，通过本机 HTTP 提供批量 O(1) 查询；
+fields.yaml 变化（mtime/size）时在下一次请求前自动重新加载；
+字段池暂不可读（不存在、正在写入导致 YAML 不完整）时返回 503，请求格式错误返回 400
+"""
+
+import argparse
+import json
+import sys
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from yaml_io import YAMLError, load_yaml_file
+
+REFERENCE_PREFIX = 'dynamic_fields.'
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_FIELDS_FILE = Path(__file__).resolve().parent.parent / 'fields' / 'fields-s3out' / 'fields.yaml'
+
+
+def field_registry_of(data: Any) -> Dict[str, Any]:
+    """取出字段注册表：优先使用 dynamic_fields 根节点，否则为去掉 _meta 的顶层映射"""
+    if not isinstance(data, dict):
+        return {}
+    if isinstance(data.get('dynamic_fields'), dict):
+        return data['dynamic_fields']
+    return {name: value for name, value in data.items() if name != '_meta'}
+
+
+def flatten_paths(registry: Dict[str, Any]) -> Dict[str, Any]:
+    """将嵌套字段注册表展开为 点分路径 → 值 的扁平表（值为原对象引用，不复制）"""
+    table = {}
+    stack: List[Tuple[str, Any]] = list(registry.items())
+    while stack:
+        path, value = stack.pop()
+        table[path] = value
+        if isinstance(value, dict):
+            stack.extend((f"{path}.{key}", child) for key, child in value.items() if isinstance(key, str))
+    return table
+
+
+def normalize_path(path: str) -> str:
+    """去掉引用模板的 {{ }} 与 dynamic_fields. 前缀"""
+    path = path.strip()
+    if path.startswith('{{') and path.endswith('}}'):
+        path = path[2:-2].strip()
+    if path.startswith(REFERENCE_PREFIX):
+        path = path[len(REFERENCE_PREFIX):]
+    return path
+
+
+class FieldPathTable:
+    """字段路径查找表 - 跟踪源文件状态，变化时重新加载"""
+
+    def __init__(self, fields_file: Path):
+        self.fields_file = Path(fields_file)
+        self.table: Dict[str, Any] = {}
+        self.generation = 0
+        self._signature: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """字段池文件变化时重新加载，返回是否发生了重新加载"""
+        stat = self.fields_file.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return False
+
+        with self._lock:
+            if signature == self._signature:
+                return False
+            table = flatten_paths(field_registry_of(load_yaml_file(self.fields_file)))
+            self.table, self._signature = table, signature
+            self.generation += 1
+            print(f"已加载字段池: {self.fields_file} ({len(table)} 条路径, 第 {self.generation} 代)")
+            return True
+
+    def lookup(self, paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """批量查询路径，返回 路径 → {found, value}"""
+        table = self.table
+        results = {}
+        for path in paths:
+            key = normalize_path(path)
+            if key in table:
+                results[path] = {'found': True, 'value': table[key]}
+            else:
+                results[path] = {'found': False, 'value': None}
+        return results
+
+
+class FieldLookupHandler(BaseHTTPRequestHandler):
+    """HTTP 请求处理：POST /lookup 批量查询，GET /health 健康检查"""
+
+    table: FieldPathTable = None
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _refresh(self) -> bool:
+        """请求前按需重新加载字段池；失败时发送错误响应并返回 False"""
+        try:
+            self.table.refresh()
+            return True
+        except (OSError, YAMLError) as e:
+            self._send_json(503, {'error': f'字段池暂不可用: {e}'})
+        except Exception as e:
+            self._send_json(500, {'error': f'加载字段池失败: {e}'})
+        return False
+
+    def _read_paths(self) -> Optional[List[str]]:
+        """解析请求体中的 paths（非空字符串列表）；格式错误时发送 400 并返回 None"""
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        except ValueError as e:
+            self._send_json(400, {'error': f'请求体不是有效的 JSON: {e}'})
+            return None
+        paths = request.get('paths') if isinstance(request, dict) else None
+        if not isinstance(paths, list) or not all(isinstance(path, str) and path.strip() for path in paths):
+            self._send_json(400, {'error': '请求格式错误，应为 {"paths": [...]}，且每个路径为非空字符串'})
+            return None
+        return paths
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_json(404, {'error': f'未知路径: {self.path}'})
+            return
+        if not self._refresh():
+            return
+        self._send_json(200, {'status': 'ok', 'paths': len(self.table.table), 'generation': self.table.generation})
+
+    def do_POST(self):
+        if self.path != '/lookup':
+            self._send_json(404, {'error': f'未知路径: {self.path}'})
+            return
+        paths = self._read_paths()
+        if paths is None or not self._refresh():
+            return
+        try:
+            results = self.table.lookup(paths)
+        except Exception as e:
+            self._send_json(500, {'error': f'查询失败: {e}'})
+            return
+        self._send_json(200, {'generation': self.table.generation, 'results': results})
+
+    def log_message(self, format, *args):
+        pass  # 高频查询不逐条输出访问日志
+
+
+def serve(fields_file: Path, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """启动常驻查询服务（阻塞）"""
+    table = FieldPathTable(fields_file)
+    table.refresh()
+    handler = type('BoundFieldLookupHandler', (FieldLookupHandler,), {'table': table})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"字段查询服务已启动: http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+class FieldLookupClient:
+    """字段查询服务客户端"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 5.0):
+        self.base_url = f"http://{host}:{port}"
+        self.timeout = timeout
+
+    def lookup(self, paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量查询路径，返回 路径 → {found, value}"""
+        request = urllib.request.Request(
+            f"{self.base_url}/lookup",
+            data=json.dumps({'paths': list(paths)}, ensure_ascii=False).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())['results']
+
+    def health(self) -> Dict[str, Any]:
+        """查询服务状态"""
+        with urllib.request.urlopen(f"{self.base_url}/health", timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='字段池常驻查询服务')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='监听/连接地址（默认仅本机）')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='监听/连接端口')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='启动常驻查询服务')
+    serve_parser.add_argument('--fields', default=str(DEFAULT_FIELDS_FILE), help='合并后的 fields.yaml 路径')
+
+    lookup_parser = subparsers.add_parser('lookup', help='向运行中的服务批量查询路径')
+    lookup_parser.add_argument('paths', nargs='+', help='字段路径，如 TOKEN_BUDGET_TOTAL.example')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(Path(args.fields), args.host, args.port)
+    else:
+        results = FieldLookupClient(args.host, args.port).lookup(args.paths)
+        print(json.dumps(results, ensure_ascii=False, indent=2, default=str))
+        sys.exit(0 if all(result['found'] for result in results.values()) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内共享字段池
+合并器、验证器与修复器注入同一个 FieldPool：合并器以 publish() 直接交付内存中的合并结果，
+其余工具读取同一份注册表，同一进程内 fields.yaml 只解析、持有一次
+
+    pool = FieldPool()
+    AIFieldMerger(field_pool=pool).run()
+    FieldPoolValidator(config_path, field_pool=pool).validate_all(project_root)
+    FieldAutoFixer(fields_yaml, modules_dir, field_pool=pool).scan_hardcoded_values()
+"""
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Union
+
+from lazy_field_pool import META_KEY, REGISTRY_ROOT, LazyFieldPool
+
+PathLike = Union[str, Path]
+
+
+def registry_of(document: Any) -> Mapping[str, Any]:
+    """取出字段注册表：dynamic_fields 根节点下的条目，没有该根节点时为去掉 _meta 的顶层条目"""
+    if not isinstance(document, dict):
+        return {}
+    if REGISTRY_ROOT in document:
+        registry = document[REGISTRY_ROOT]
+        return registry if isinstance(registry, dict) else {}
+    return {key: value for key, value in document.items() if key != META_KEY}
+
+
+class FieldPool(Mapping):
+    """共享字段池：以映射形式提供字段注册表
+
+    内容来源为 publish() 发布的内存文档，或 source 文件（LazyFieldPool 延迟加载，
+    max_entries 限制已解析条目的缓存数量）。每次内容更换 generation 加一，使用方据此判断派生缓存是否失效。
+    """
+
+    def __init__(self, source: PathLike = None, max_entries: Optional[int] = None):
+        self.source: Optional[Path] = Path(source) if source else None
+        self.max_entries = max_entries
+        self.generation = 0
+        self._document: Optional[Dict] = None
+        self._registry: Mapping[str, Any] = {}
+        self._lock = threading.Lock()
+        if self.source is not None:
+            self._registry = LazyFieldPool(self.source, max_entries)
+
+    def publish(self, document: Dict, source: PathLike = None):
+        """发布内存中的完整字段池文档（如合并结果），替换当前内容；source 为其对应的文件路径"""
+        with self._lock:
+            if source is not None:
+                self.source = Path(source)
+            self._document = document
+            self._registry = registry_of(document)
+            self.generation += 1
+
+    def reload(self, source: PathLike = None):
+        """丢弃当前内容，改为从 source 文件（默认为当前 source）延迟加载"""
+        with self._lock:
+            if source is not None:
+                self.source = Path(source)
+            self._document = None
+            self._registry = LazyFieldPool(self.source, self.max_entries) if self.source else {}
+            self.generation += 1
+
+    @property
+    def in_memory(self) -> bool:
+        """内容是否为已发布的内存文档"""
+        return self._document is not None
+
+    @property
+    def available(self) -> bool:
+        """是否有可读取的内容（已发布文档或存在的 source 文件）"""
+        return self._document is not None or (self.source is not None and self.source.exists())
+
+    @property
+    def root_keys(self) -> List[str]:
+        """文档顶层键（按出现顺序）"""
+        if self._document is not None:
+            return list(self._document)
+        if isinstance(self._registry, LazyFieldPool):
+            return self._registry.root_keys
+        return []
+
+    @property
+    def registry(self) -> Mapping[str, Any]:
+        return self._registry
+
+    def __getitem__(self, key: str) -> Any:
+        return self._registry[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._registry
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._registry)
+
+    def __len__(self) -> int:
+        return len(self._registry)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件变化监听
+Linux 下通过 ctypes 直接调用 inotify（无第三方依赖），其他平台回退为按 mtime/size 轮询；
+变化按短暂防抖合并成批产出，inotify 事件队列溢出（事件丢失）时产出 RESCAN 要求调用方完整重新扫描
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple, Union
+
+# inotify 事件掩码（linux/inotify.h）
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+PathLike = Union[str, Path]
+
+# watch_changes 产出的特殊批次：变化事件已丢失，需完整重新扫描
+RESCAN = None
+
+
+class PollingWatcher:
+    """轮询监听：比较文件 (mtime_ns, size) 快照"""
+
+    def __init__(self, directories: Iterable[PathLike], files: Iterable[PathLike] = (), pattern: str = '*.md'):
+        self.directories = [Path(d).absolute() for d in directories]
+        self.files = [Path(f).absolute() for f in files]
+        self.pattern = pattern
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        paths = [p for d in self.directories for p in d.rglob(self.pattern)] + self.files
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout: float) -> Set[Path]:
+        """等待至多 timeout 秒，返回变化（新增、修改、删除）的文件"""
+        time.sleep(timeout)
+        snapshot = self._take_snapshot()
+        changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                   if snapshot.get(path) != self._snapshot.get(path)}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """inotify 监听：递归监听目录，单独文件通过其所在目录监听（兼容编辑器的原子替换保存）"""
+
+    def __init__(self, directories: Iterable[PathLike], files: Iterable[PathLike] = (), pattern: str = '*.md'):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 失败')
+
+        self.pattern = pattern
+        self.directories = [Path(d).absolute() for d in directories]
+        self.files = {Path(f).absolute() for f in files}
+        self._watches: Dict[int, Tuple[Path, bool]] = {}  # wd → (目录, 是否递归监听的文档目录)
+        try:
+            self.resync()
+        except OSError:
+            self.close()
+            raise
+
+    def resync(self):
+        """重新遍历并监听全部目录（重复监听同一目录返回同一 wd），补上事件丢失期间新建的子目录"""
+        for directory in self.directories:
+            for sub in [directory] + [p for p in directory.rglob('*') if p.is_dir()]:
+                self._watch(sub, True)
+        for file_path in self.files:
+            self._watch(file_path.parent, False)
+
+    def _watch(self, directory: Path, recursive: bool):
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch 失败: {directory}')
+        _, was_recursive = self._watches.get(wd, (directory, False))
+        self._watches[wd] = (directory, recursive or was_recursive)
+
+    def poll(self, timeout: float) -> Set[Path]:
+        """等待至多 timeout 秒，返回变化的文件；事件队列溢出时抛出 OverflowError（期间的事件已丢失）"""
+        changed: Set[Path] = set()
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return changed
+        try:
+            buffer = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, name_len = EVENT_HEADER.unpack_from(buffer, offset)
+            name = buffer[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + name_len].rstrip(b'\0')
+            offset += EVENT_HEADER.size + name_len
+
+            if mask & IN_Q_OVERFLOW:
+                raise OverflowError('inotify 事件队列溢出')
+            if wd not in self._watches or not name:
+                continue
+            directory, recursive = self._watches[wd]
+            path = directory / os.fsdecode(name)
+
+            if mask & IN_ISDIR:
+                if recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch(path, True)
+                    changed.update(p for p in path.rglob(self.pattern))
+                continue
+            if path in self.files or (recursive and fnmatch.fnmatch(path.name, self.pattern)):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_watcher(directories: Iterable[PathLike], files: Iterable[PathLike] = (), pattern: str = '*.md'):
+    """创建监听器：优先 inotify，不可用时回退为轮询"""
+    directories, files = list(directories), list(files)
+    try:
+        return InotifyWatcher(directories, files, pattern)
+    except (OSError, AttributeError):
+        return PollingWatcher(directories, files, pattern)
+
+
+def watch_changes(watcher, interval: float = 0.5, debounce: float = 0.02) -> Iterator[Optional[Set[Path]]]:
+    """持续产出变化文件的批次；首个事件后再等待 debounce 秒合并同一次保存产生的多个事件
+
+    inotify 事件队列溢出时重新建立目录监听并产出 RESCAN，调用方应完整重新扫描后继续迭代。
+    """
+    while True:
+        try:
+            changed = watcher.poll(interval)
+            if not changed:
+                continue
+            while True:
+                more = watcher.poll(debounce) if isinstance(watcher, InotifyWatcher) else set()
+                if not more:
+                    break
+                changed |= more
+        except OverflowError:
+            watcher.resync()
+            changed = RESCAN
+        yield changed
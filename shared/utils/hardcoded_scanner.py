@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+硬编码数值扫描引擎
+所有模式预编译一次；从每个模式中提取一个必需字面字符，合并为字符集正则对整个文件做单遍预筛，
+只有命中的候选行才运行字面字符出现在行内的模式，结果与逐行逐模式扫描完全一致；
+多文件扫描可分发到进程池并行执行，结果按输入路径顺序产出
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+# 已使用动态字段引用的行不再扫描
+DYNAMIC_FIELD_MARKER = '{{dynamic_fields.'
+
+# 硬编码数值模式：(正则, 字段类别)
+HARDCODED_PATTERNS: List[Tuple[str, str]] = [
+    # 时间模式
+    (r'\b(\d+-\d+)周\b', 'TIME_BUDGETS'),
+    (r'\b(\d+)小时\b', 'TIME_BUDGETS'),
+    (r'\b(\d+-\d+)天\b', 'TIME_BUDGETS'),
+    (r'\b(\d+)分钟\b', 'TIME_BUDGETS'),
+    
+    # 百分比模式
+    (r'\b(≥\d+%)\b', 'SUCCESS_THRESHOLDS'),
+    (r'\b(≤\d+%)\b', 'SUCCESS_THRESHOLDS'),
+    (r'\b(\d+%:\d+%)\b', 'HUMAN_AI_RATIOS'),
+    (r'\b(\d+%)\b', 'SUCCESS_THRESHOLDS'),
+    
+    # Token预算模式
+    (r'\b(\d+T)\b', 'TOKEN_BUDGETS'),
+    
+    # 金额模式
+    (r'\$([\d,]+[KMB]?)\b', 'FINANCIAL_THRESHOLDS'),
+    
+    # 数量模式
+    (r'\b(≥\d+个)\b', 'QUANTITY_THRESHOLDS'),
+    (r'\b(≥\d+年)\b', 'EXPERIENCE_THRESHOLDS'),
+    (r'\b(≤\d+秒)\b', 'PERFORMANCE_METRICS'),
+]
+
+
+class HardcodedMatch(NamedTuple):
+    """单个硬编码数值匹配"""
+    line_number: int
+    line_content: str
+    value: str
+    category: str
+    start: int  # 数值在文件内容中的起始偏移（字符）
+    end: int    # 数值在文件内容中的结束偏移（字符）
+
+
+def required_literal(pattern: str) -> Optional[str]:
+    """提取模式任何匹配都必然包含的一个字面字符（取最后一个，通常是单位字符），无法确定时返回 None"""
+    def walk(items) -> Optional[str]:
+        found = None
+        for op, arg in items:
+            if op is sre_constants.LITERAL:
+                found = chr(arg)
+            elif op is sre_constants.SUBPATTERN:
+                found = walk(arg[-1]) or found
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and arg[0] >= 1:
+                found = walk(arg[2]) or found
+        return found
+
+    try:
+        return walk(sre_parse.parse(pattern))
+    except Exception:
+        return None
+
+
+class HardcodedValueScanner:
+    """硬编码数值扫描器
+
+    预筛正则是各模式必需字面字符的字符集（若有模式提取不到字面字符，则退化为所有模式的交替），
+    它能在任何存在单模式匹配的行上命中（模式均不跨行），因此只需对候选行运行模式的 finditer：
+    行内结果按模式定义顺序、再按位置排列，同一数值被多个模式覆盖时（如 ≥70% 与 70%）
+    各模式照常分别报告各自类别。
+    """
+
+    def __init__(self, patterns: List[Tuple[str, str]]):
+        self.pattern_sources = list(patterns)
+        self.patterns = [(re.compile(pattern), category, required_literal(pattern))
+                         for pattern, category in patterns]
+        literals = {literal for _, _, literal in self.patterns}
+        if None in literals:
+            self.trigger = re.compile('|'.join(f'(?:{pattern})' for pattern, _ in patterns))
+        else:
+            self.trigger = re.compile('[' + ''.join(re.escape(literal) for literal in sorted(literals)) + ']')
+
+    def scan(self, content: str) -> List[HardcodedMatch]:
+        """扫描文件内容，返回按行号排序的匹配列表"""
+        matches = []
+        line_number, counted_to = 1, 0
+        position = 0
+
+        while True:
+            trigger = self.trigger.search(content, position)
+            if trigger is None:
+                break
+
+            line_start = content.rfind('\n', 0, trigger.start()) + 1
+            line_end = content.find('\n', trigger.start())
+            if line_end == -1:
+                line_end = len(content)
+
+            line_number += content.count('\n', counted_to, line_start)
+            counted_to = line_start
+            position = line_end + 1
+
+            line = content[line_start:line_end]
+            if DYNAMIC_FIELD_MARKER in line:
+                continue
+
+            line_content = line.strip()
+            for pattern, category, literal in self.patterns:
+                if literal is not None and literal not in line:
+                    continue
+                for match in pattern.finditer(line):
+                    group = 1 if match.re.groups else 0
+                    start, end = match.span(group)
+                    matches.append(HardcodedMatch(
+                        line_number, line_content, match.group(group), category,
+                        line_start + start, line_start + end
+                    ))
+
+        return matches
+
+
+def scan_file(scanner: HardcodedValueScanner, file_path: Union[str, Path]) -> List[HardcodedMatch]:
+    """读取并扫描单个文件（不做换行转换，偏移与 corpus_reader.read_text 读取的内容一致）"""
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        return scanner.scan(f.read())
+
+
+# 工作进程内的扫描器，由进程池初始化函数按模式列表构建一次
+_worker_scanner: Optional[HardcodedValueScanner] = None
+
+
+def _init_worker(patterns: List[Tuple[str, str]]):
+    global _worker_scanner
+    _worker_scanner = HardcodedValueScanner(patterns)
+
+
+def _scan_file_safe(scanner: HardcodedValueScanner, file_path: Path) -> Tuple[List[HardcodedMatch], Optional[str]]:
+    """扫描单个文件，异常以错误信息返回而不中断整批扫描"""
+    try:
+        return scan_file(scanner, file_path), None
+    except Exception as e:
+        return [], str(e)
+
+
+def _scan_file_worker(file_path: Path) -> Tuple[List[HardcodedMatch], Optional[str]]:
+    return _scan_file_safe(_worker_scanner, file_path)
+
+
+def scan_files(scanner: HardcodedValueScanner, file_paths: Sequence[Path], jobs: int = 1,
+               chunksize: int = None) -> Iterator[Tuple[Path, List[HardcodedMatch], Optional[str]]]:
+    """扫描多个文件，按 file_paths 顺序产出 (路径, 匹配列表, 错误信息)
+
+    jobs > 1 时分发到进程池（0 为使用全部CPU核心）；chunksize 为每次派发给工作进程的文件数，
+    大量小文件时调大可减少进程间通信开销，默认按每个进程约4批自动计算。
+    """
+    file_paths = list(file_paths)
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+
+    if jobs <= 1 or len(file_paths) <= 1:
+        for file_path in file_paths:
+            yield (file_path, *_scan_file_safe(scanner, file_path))
+        return
+
+    workers = min(jobs, len(file_paths))
+    if not chunksize or chunksize < 1:
+        chunksize = max(1, len(file_paths) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(scanner.pattern_sources,)) as executor:
+        results = executor.map(_scan_file_worker, file_paths, chunksize=chunksize)
+        for file_path, (matches, error) in zip(file_paths, results):
+            yield file_path, matches, error
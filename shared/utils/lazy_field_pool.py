@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟加载的字段池
+首次访问时按行扫描 fields.yaml 建立 字段名 → 字节区间 索引（不解析 YAML），
+之后只解析实际访问到的字段条目并缓存；键列表、成员判断与计数无需解析任何条目
+"""
+
+import mmap
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+from yaml_io import safe_load
+
+REGISTRY_ROOT = 'dynamic_fields'
+META_KEY = '_meta'
+
+# 顶层键行（第0列，不含注释与序列项）
+TOP_KEY_PATTERN = re.compile(rb'''^([^\s#\-][^:\r\n]*?)[ \t]*:(?=[ \t]|\r?$)''', re.M)
+# 首个有内容的缩进行，用于确定条目缩进
+INDENTED_LINE_PATTERN = re.compile(rb'^( +)[^\s#]', re.M)
+
+
+def _key_of(raw: bytes) -> str:
+    key = raw.decode('utf-8')
+    if len(key) >= 2 and key[0] == key[-1] and key[0] in '"\'':
+        key = key[1:-1]
+    return key
+
+
+class LazyFieldPool(Mapping):
+    """字段注册表的只读延迟映射
+
+    注册表为 dynamic_fields 根节点下的条目；没有该根节点时为去掉 _meta 的顶层条目。
+    文件包含锚点别名等无法按条目独立解析的结构时，自动回退为整体解析一次。
+    max_entries 限制已解析条目的缓存数量（按最近访问淘汰，被淘汰的条目再次访问时重新解析），None 为不限。
+    """
+
+    def __init__(self, fields_file: Union[str, Path], max_entries: Optional[int] = None):
+        self.fields_file = Path(fields_file)
+        self.max_entries = max_entries
+        self._root_keys: Optional[List[str]] = None
+        self._spans: Optional[Dict[str, Tuple[int, int]]] = None
+        self._cache: 'OrderedDict[str, Any]' = OrderedDict()
+        self._document: Optional[Dict] = None
+        self._lock = threading.RLock()
+
+    def reload(self):
+        """丢弃索引与已解析条目，下次访问时重新建立"""
+        with self._lock:
+            self._root_keys = None
+            self._spans = None
+            self._cache.clear()
+            self._document = None
+
+    def _build_index(self):
+        if self._spans is not None:
+            return
+
+        spans: Dict[str, Tuple[int, int]] = {}
+        root_keys: List[str] = []
+        with open(self.fields_file, 'rb') as f:
+            size = f.seek(0, 2)
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+            try:
+                top = [(match.start(), _key_of(match.group(1))) for match in TOP_KEY_PATTERN.finditer(data)]
+                root_keys = [key for _, key in top]
+                bounds = [start for start, _ in top[1:]] + [size]
+
+                registry = [(start, end, key) for (start, key), end in zip(top, bounds)]
+                for start, end, key in registry:
+                    if key == REGISTRY_ROOT:
+                        registry = self._child_spans(data, start, end)
+                        break
+                else:
+                    registry = [(start, end, key) for start, end, key in registry if key != META_KEY]
+
+                for start, end, key in registry:
+                    spans[key] = (start, end)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+
+        self._root_keys, self._spans = root_keys, spans
+
+    @staticmethod
+    def _child_spans(data, start: int, end: int) -> List[Tuple[int, int, str]]:
+        """定位根节点下各条目的字节区间"""
+        body = data.find(b'\n', start, end) + 1
+        if body <= 0:
+            return []
+        first = INDENTED_LINE_PATTERN.search(data, body, end)
+        if first is None:
+            return []
+
+        indent = len(first.group(1))
+        child_pattern = re.compile(rb'^ {%d}([^\s#\-][^:\r\n]*?)[ \t]*:(?=[ \t]|\r?$)' % indent, re.M)
+        children = [(match.start(), _key_of(match.group(1))) for match in child_pattern.finditer(data, body, end)]
+        bounds = [child_start for child_start, _ in children[1:]] + [end]
+        return [(child_start, child_end, key) for (child_start, key), child_end in zip(children, bounds)]
+
+    def _load_document(self) -> Dict:
+        """整体解析（回退路径）"""
+        if self._document is None:
+            with open(self.fields_file, 'r', encoding='utf-8') as f:
+                self._document = safe_load(f) or {}
+        return self._document
+
+    def _parse_entry(self, key: str) -> Any:
+        start, end = self._spans[key]
+        with open(self.fields_file, 'rb') as f:
+            f.seek(start)
+            chunk = f.read(end - start)
+        try:
+            entry = safe_load(chunk.decode('utf-8'))
+            if isinstance(entry, dict) and len(entry) == 1:
+                return next(iter(entry.values()))
+        except Exception:
+            pass
+
+        document = self._load_document()
+        registry = document.get(REGISTRY_ROOT) if REGISTRY_ROOT in self._root_keys else document
+        return registry[key]
+
+    def raw_entries(self) -> Dict[str, bytes]:
+        """返回各字段条目的原始字节（一次读取整个文件），用于比较条目是否变化"""
+        self._build_index()
+        with open(self.fields_file, 'rb') as f:
+            data = f.read()
+        return {key: data[start:end] for key, (start, end) in self._spans.items()}
+
+    @property
+    def root_keys(self) -> List[str]:
+        """文件顶层键（按出现顺序）"""
+        self._build_index()
+        return list(self._root_keys)
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            if key in self._cache:
+                if self.max_entries is not None:
+                    self._cache.move_to_end(key)
+                return self._cache[key]
+
+            self._build_index()
+            if key not in self._spans:
+                raise KeyError(key)
+            value = self._cache[key] = self._parse_entry(key)
+            if self.max_entries is not None:
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            return value
+
+    def __contains__(self, key) -> bool:
+        self._build_index()
+        return key in self._spans
+
+    def __iter__(self) -> Iterator[str]:
+        self._build_index()
+        return iter(self._spans)
+
+    def __len__(self) -> int:
+        self._build_index()
+        return len(self._spans)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Markdown 章节树
+单遍扫描文档建立标题树及各章节的起止偏移（跳过围栏代码块中的 # 行），
+之后按标题查找章节、取章节内容均为字典查找加切片
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional
+
+# ATX 标题行，或围栏代码块的起止行（``` / ~~~，最多缩进3个空格）
+LINE_PATTERN = re.compile(r'^(?:(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*|( {0,3})(`{3,}|~{3,})([^\r\n]*?))\r?$', re.M)
+
+
+class MarkdownSection:
+    """一个章节：从标题行开始，到下一个同级或更高级标题（或文末）为止"""
+    __slots__ = ('level', 'title', 'start', 'body_start', 'end', 'parent', 'children')
+
+    def __init__(self, level: int, title: str, start: int, body_start: int, parent: 'MarkdownSection' = None):
+        self.level = level
+        self.title = title
+        self.start = start            # 标题行起始偏移
+        self.body_start = body_start  # 标题行之后的偏移
+        self.end = -1                 # 章节结束偏移（不含）
+        self.parent = parent
+        self.children: List['MarkdownSection'] = []
+
+    @property
+    def header(self) -> str:
+        return f"{'#' * self.level} {self.title}"
+
+    def __repr__(self) -> str:
+        return f'MarkdownSection({self.header!r}, {self.start}:{self.end})'
+
+
+class MarkdownSections:
+    """文档的章节树；offsets 为字符偏移，可直接切片原文"""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.root = MarkdownSection(0, '', 0, 0)
+        self.sections: List[MarkdownSection] = []
+        self._by_header: Dict[str, MarkdownSection] = {}
+        self._parse()
+
+    def _parse(self):
+        content = self.content
+        stack = [self.root]
+        fence: Optional[str] = None
+
+        for match in LINE_PATTERN.finditer(content):
+            marker = match.group(4)
+            if marker is not None:
+                if fence is None:
+                    if marker[0] != '`' or '`' not in match.group(5):
+                        fence = marker
+                elif marker[0] == fence[0] and len(marker) >= len(fence) and not match.group(5).strip():
+                    fence = None
+                continue
+            if fence is not None:
+                continue
+
+            level = len(match.group(1))
+            while stack[-1].level >= level:
+                stack.pop().end = match.start()
+            section = MarkdownSection(level, match.group(2), match.start(), match.end(), stack[-1])
+            stack[-1].children.append(section)
+            stack.append(section)
+            self.sections.append(section)
+            self._by_header.setdefault(section.header, section)
+
+        for section in stack:
+            section.end = len(content)
+
+    def find(self, header: str) -> Optional[MarkdownSection]:
+        """按标题行（如 '## 1 LNST - 精益创业核心层'）查找首个匹配的章节"""
+        return self._by_header.get(header.strip())
+
+    def text(self, section: MarkdownSection) -> str:
+        """章节完整文本（含标题行与全部子章节）"""
+        return self.content[section.start:section.end]
+
+    def __iter__(self) -> Iterator[MarkdownSection]:
+        return iter(self.sections)
+
+    def __len__(self) -> int:
+        return len(self.sections)
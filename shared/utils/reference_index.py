@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字段引用双向索引
+字段 → 引用它的文档及行号、文档 → 它引用的字段，两个方向同步维护，支持按文档增量更新；
+孤立字段判断与"改名/删除某字段会影响哪里"的查询均为字典查找；
+引用路径解析结果按前缀缓存，重复引用只解析一次
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+
+class ReferenceLocation(NamedTuple):
+    """一处字段引用"""
+    file_path: str
+    line_number: int
+    path: str  # 完整引用路径，如 TOKEN_BUDGET_TOTAL.example
+
+
+def field_of(reference_path: str) -> str:
+    """引用路径中的字段名"""
+    return reference_path.split('.', 1)[0]
+
+
+class ReferenceIndex:
+    """字段引用双向索引"""
+
+    def __init__(self):
+        # 字段 → {文档 → [(行号, 引用路径)]}
+        self._by_field: Dict[str, Dict[str, List[tuple]]] = {}
+        # 文档 → 引用的字段集合
+        self._by_file: Dict[str, Set[str]] = {}
+        self.reference_count = 0
+
+    def set_file(self, file_path: str, references: Iterable):
+        """替换某文档的全部引用；references 为 (引用路径, 行号) 序列"""
+        self.remove_file(file_path)
+        fields = set()
+        for path, line_number in references:
+            field_name = field_of(path)
+            self._by_field.setdefault(field_name, {}).setdefault(file_path, []).append((line_number, path))
+            fields.add(field_name)
+            self.reference_count += 1
+        if fields:
+            self._by_file[file_path] = fields
+
+    def remove_file(self, file_path: str):
+        """移除某文档的全部引用"""
+        for field_name in self._by_file.pop(file_path, ()):
+            files = self._by_field[field_name]
+            self.reference_count -= len(files.pop(file_path))
+            if not files:
+                del self._by_field[field_name]
+
+    def is_referenced(self, field_name: str) -> bool:
+        """字段是否被任何文档引用"""
+        return field_name in self._by_field
+
+    def orphans(self, field_names: Iterable[str]) -> List[str]:
+        """给定字段中未被引用的字段（保持输入顺序）"""
+        by_field = self._by_field
+        return [field_name for field_name in field_names if field_name not in by_field]
+
+    def fields_in(self, file_path: str) -> Set[str]:
+        """文档引用的字段"""
+        return set(self._by_file.get(file_path, ()))
+
+    def files_referencing(self, field_name: str) -> List[str]:
+        """引用某字段的文档"""
+        return list(self._by_field.get(field_name, ()))
+
+    def impact(self, field_name: str) -> List[ReferenceLocation]:
+        """改名或删除字段时受影响的全部引用位置（按文档、行号排序）"""
+        locations = [ReferenceLocation(file_path, line_number, path)
+                     for file_path, entries in self._by_field.get(field_name, {}).items()
+                     for line_number, path in entries]
+        return sorted(locations)
+
+    def usage_counts(self) -> Dict[str, int]:
+        """各字段被引用的次数"""
+        return {field_name: sum(len(entries) for entries in files.values())
+                for field_name, files in self._by_field.items()}
+
+
+class ReferenceResolver:
+    """引用路径解析缓存
+
+    按字段分组缓存每个路径前缀的解析结果（节点, 失败信息），A.b 与 A.b.c 共享 A、A.b 的查找；
+    失败信息为 ('field', 字段名) 或 ('path', 首个不存在的路径前缀)，成功为 None。
+    """
+
+    def __init__(self, registry: Mapping[str, Any] = None):
+        self.registry: Mapping[str, Any] = registry if registry is not None else {}
+        self.generation = 0  # 注册表内容版本（共享字段池的 generation）
+        self._entries: Dict[str, Dict[str, Tuple[Any, Optional[Tuple[str, str]]]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def reset(self, registry: Mapping[str, Any], generation: int = 0):
+        """绑定新的注册表（或其新版本）并清空缓存"""
+        self.registry = registry
+        self.generation = generation
+        self._entries.clear()
+
+    def invalidate(self, field_names: Iterable[str]):
+        """只丢弃指定字段下的缓存（注册表内容部分变化时）"""
+        for field_name in field_names:
+            self._entries.pop(field_name, None)
+
+    def _lookup(self, path: str) -> Tuple[Any, Optional[Tuple[str, str]]]:
+        field_entries = self._entries.setdefault(field_of(path), {})
+        entry = field_entries.get(path)
+        if entry is None:
+            parent, separator, part = path.rpartition('.')
+            if not separator:
+                entry = (self.registry[path], None) if path in self.registry else (None, ('field', path))
+            else:
+                node, failure = self._lookup(parent)
+                if failure is not None:
+                    entry = (None, failure)
+                elif isinstance(node, dict) and part in node:
+                    entry = (node[part], None)
+                else:
+                    entry = (None, ('path', path))
+            field_entries[path] = entry
+        return entry
+
+    def resolve(self, path: str) -> Optional[Tuple[str, str]]:
+        """解析引用路径，返回失败信息（成功为 None）"""
+        if path in self._entries.get(field_of(path), ()):
+            self.hits += 1
+        else:
+            self.misses += 1
+        return self._lookup(path)[1]
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate, 4),
+            'cached_paths': sum(len(entries) for entries in self._entries.values())
+        }
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式验证报告写入
+结果产生时逐条写出并累计计数，不在内存中保留明细；汇总作为尾部记录写在最后。
+支持三种格式：json（与原报告结构相同的单个文档）、ndjson（每行一条记录）、
+compact（行为数组、重复字符串按列编码为编号的紧凑 NDJSON）；路径以 .gz 结尾时 gzip 压缩
+"""
+
+import gzip
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator, Optional, Union
+
+REPORT_FORMATS = ('json', 'ndjson', 'compact')
+RESULT_FIELDS = ('level', 'status', 'message', 'file_path', 'line_number', 'suggestion')
+# compact 格式中按列编号的字段（取值重复度高）
+SYMBOL_FIELDS = ('level', 'status', 'file_path', 'suggestion')
+STATUS_COUNTERS = {'error': 'errors', 'warning': 'warnings', 'pass': 'passed'}
+
+PathLike = Union[str, Path]
+
+
+def _open(path: PathLike, mode: str) -> IO[str]:
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class ReportWriter:
+    """报告写入器基类：write() 逐条写出并计数，close() 写入汇总尾部并返回汇总
+
+    max_samples 为每种状态（error/warning）保留的前 N 条结果，供终端摘要使用，内存占用与报告规模无关。
+    """
+
+    format = ''
+
+    def __init__(self, output_path: PathLike, max_samples: int = 0):
+        self.output_path = Path(output_path)
+        self.timestamp = datetime.now().isoformat()
+        self.counts = {'total_checks': 0, 'errors': 0, 'warnings': 0, 'passed': 0}
+        self.max_samples = max_samples
+        self.samples: Dict[str, list] = {'error': [], 'warning': []}
+        self._file: Optional[IO[str]] = _open(self.output_path, 'w')
+        self._write_header()
+
+    @property
+    def summary(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+    def write(self, result):
+        """写出一条验证结果（任何带 RESULT_FIELDS 属性的对象）"""
+        self.counts['total_checks'] += 1
+        counter = STATUS_COUNTERS.get(result.status)
+        if counter:
+            self.counts[counter] += 1
+        samples = self.samples.get(result.status)
+        if samples is not None and len(samples) < self.max_samples:
+            samples.append(result)
+        self._write_result(result)
+
+    def write_all(self, results: Iterable):
+        for result in results:
+            self.write(result)
+
+    def close(self) -> Dict[str, int]:
+        if self._file is not None:
+            self._write_trailer()
+            self._file.close()
+            self._file = None
+        return self.summary
+
+    def __enter__(self) -> 'ReportWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_header(self):
+        pass
+
+    def _write_result(self, result):
+        raise NotImplementedError
+
+    def _write_trailer(self):
+        pass
+
+
+class JSONReportWriter(ReportWriter):
+    """单个 JSON 文档：{"timestamp", "details": [...], "summary"}，明细逐条写出"""
+
+    format = 'json'
+
+    def _write_header(self):
+        self._file.write('{\n  "timestamp": %s,\n  "details": [' % _dumps(self.timestamp))
+
+    def _write_result(self, result):
+        detail = json.dumps({name: getattr(result, name) for name in RESULT_FIELDS}, ensure_ascii=False, indent=2)
+        separator = ',\n    ' if self.counts['total_checks'] > 1 else '\n    '
+        self._file.write(separator + detail.replace('\n', '\n    '))
+
+    def _write_trailer(self):
+        summary = json.dumps(self.counts, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+        self._file.write('%s],\n  "summary": %s\n}\n' % ('\n  ' if self.counts['total_checks'] else '', summary))
+
+
+class NDJSONReportWriter(ReportWriter):
+    """NDJSON：首行 header，每条结果一行 result，末行 summary"""
+
+    format = 'ndjson'
+
+    def _write_header(self):
+        self._file.write(_dumps({'type': 'header', 'format': self.format, 'timestamp': self.timestamp}) + '\n')
+
+    def _write_result(self, result):
+        record = {'type': 'result'}
+        for name in RESULT_FIELDS:
+            record[name] = getattr(result, name)
+        self._file.write(_dumps(record) + '\n')
+
+    def _write_trailer(self):
+        self._file.write(_dumps({'type': 'summary', **self.counts}) + '\n')
+
+
+class CompactReportWriter(NDJSONReportWriter):
+    """紧凑 NDJSON：结果行为按 RESULT_FIELDS 排列的数组，SYMBOL_FIELDS 列的值为编号，
+    编号在首次出现前以 {"type": "symbol"} 行定义，可单遍流式解码"""
+
+    format = 'compact'
+
+    def __init__(self, output_path: PathLike, max_samples: int = 0):
+        self._symbols: Dict[str, Dict[str, int]] = {name: {} for name in SYMBOL_FIELDS}
+        super().__init__(output_path, max_samples)
+
+    def _write_header(self):
+        self._file.write(_dumps({'type': 'header', 'format': self.format, 'timestamp': self.timestamp,
+                                 'columns': list(RESULT_FIELDS), 'symbols': list(SYMBOL_FIELDS)}) + '\n')
+
+    def _symbol(self, column: str, value: str) -> int:
+        table = self._symbols[column]
+        symbol = table.get(value)
+        if symbol is None:
+            symbol = table[value] = len(table)
+            self._file.write(_dumps({'type': 'symbol', 'column': column, 'id': symbol, 'value': value}) + '\n')
+        return symbol
+
+    def _write_result(self, result):
+        row = [self._symbol(name, getattr(result, name)) if name in self._symbols else getattr(result, name)
+               for name in RESULT_FIELDS]
+        self._file.write(_dumps(row) + '\n')
+
+
+WRITERS = {writer.format: writer for writer in (JSONReportWriter, NDJSONReportWriter, CompactReportWriter)}
+
+
+def open_report(output_path: PathLike, report_format: str = 'json', max_samples: int = 0) -> ReportWriter:
+    """按格式创建报告写入器"""
+    if report_format not in WRITERS:
+        raise ValueError(f"不支持的报告格式: {report_format}（可选 {', '.join(REPORT_FORMATS)}）")
+    return WRITERS[report_format](output_path, max_samples)
+
+
+def read_report(report_path: PathLike) -> Iterator[Dict[str, Any]]:
+    """流式读取 ndjson/compact 报告，逐条产出结果字典；汇总尾部以 {"type": "summary", ...} 最后产出"""
+    with _open(report_path, 'r') as f:
+        columns = RESULT_FIELDS
+        symbols: Dict[str, list] = {}
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, list):
+                result = dict(zip(columns, record))
+                for name, values in symbols.items():
+                    result[name] = values[result[name]]
+                yield result
+                continue
+
+            record_type = record.get('type')
+            if record_type == 'header':
+                columns = tuple(record.get('columns', RESULT_FIELDS))
+                symbols = {name: [] for name in record.get('symbols', ())}
+            elif record_type == 'symbol':
+                symbols[record['column']].append(record['value'])
+            elif record_type == 'result':
+                yield {name: record[name] for name in RESULT_FIELDS}
+            elif record_type == 'summary':
+                yield record
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字段 Schema 编译器
+将 field_schema.json 一次性编译为快速检查函数，供逐字段或整文件批量验证复用
+"""
+
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+# JSON Schema 类型 → Python 类型
+JSON_TYPES = {
+    'string': (str,),
+    'number': (int, float),
+    'integer': (int,),
+    'boolean': (bool,),
+    'object': (dict,),
+    'array': (list,),
+    'null': (type(None),)
+}
+
+FieldCheck = Callable[[Any], List[str]]
+
+
+def _resolve_ref(schema: Dict, node: Dict) -> Dict:
+    """解析 #/definitions/... 形式的本地引用"""
+    ref = node.get('$ref')
+    if not ref:
+        return node
+    target = schema
+    for part in ref.lstrip('#/').split('/'):
+        target = target[part]
+    return target
+
+
+def _compile_types(type_spec) -> Optional[Tuple[Tuple[type, ...], str, bool]]:
+    """编译类型约束：(允许的Python类型, 类型名, 是否允许布尔值)"""
+    if type_spec is None:
+        return None
+    names = type_spec if isinstance(type_spec, list) else [type_spec]
+    python_types = tuple(t for name in names for t in JSON_TYPES.get(name, ()))
+    return python_types, '/'.join(names), 'boolean' in names
+
+
+def _compile_properties(schema: Dict, properties: Dict, prefix: str = '') -> List[Tuple]:
+    """编译属性约束列表：(属性名, 路径, 类型约束, 枚举集合, 嵌套属性约束)"""
+    compiled = []
+    for name, node in properties.items():
+        node = _resolve_ref(schema, node)
+        path = f"{prefix}{name}"
+        enum = frozenset(node['enum']) if 'enum' in node else None
+        nested = None
+        if 'properties' in node:
+            nested = _compile_properties(schema, node['properties'], prefix=f"{path}.")
+        compiled.append((name, path, _compile_types(node.get('type')), enum, nested))
+    return compiled
+
+
+def _check_properties(data: Dict, checks: List[Tuple], errors: List[str]):
+    """按编译后的属性约束检查字典"""
+    for name, path, types, enum, nested in checks:
+        if name not in data:
+            continue
+        value = data[name]
+
+        if types is not None:
+            python_types, type_name, allow_bool = types
+            if not isinstance(value, python_types) or (isinstance(value, bool) and not allow_bool):
+                errors.append(f"属性 {path} 类型应为 {type_name}: {value}")
+                continue
+
+        if enum is not None:
+            try:
+                valid = value in enum
+            except TypeError:
+                valid = False
+            if not valid:
+                errors.append(f"属性 {path} 取值无效: {value}")
+                continue
+
+        if nested and isinstance(value, dict):
+            _check_properties(value, nested, errors)
+
+
+def field_schema_of(schema: Dict) -> Dict:
+    """取出单个字段的 Schema：字段池 Schema 以 patternProperties 描述字段，否则视为字段 Schema 本身"""
+    pattern_properties = schema.get('patternProperties')
+    if pattern_properties:
+        return next(iter(pattern_properties.values()))
+    return schema
+
+
+def compile_field_validator(schema: Dict) -> FieldCheck:
+    """将 Schema 编译为字段检查函数，返回错误列表（为空表示通过）
+
+    编译 required、type、enum（含 $ref）以及对象属性的嵌套约束；
+    additionalProperties 与数组 items 属于开放词表，不在字段合并时强制检查。
+    Schema 中声明的每一条 required/type/enum 都会生效，因此以 field_schema.json 编译时，
+    缺少 priority、type 不在枚举内或属性类型不符的字段都会被拒绝。
+    """
+    field_schema = _resolve_ref(schema, field_schema_of(schema))
+    required: Tuple[str, ...] = tuple(field_schema.get('required', ()))
+    required_set: FrozenSet[str] = frozenset(required)
+    checks = _compile_properties(schema, field_schema.get('properties', {}))
+
+    def check(field_data: Any) -> List[str]:
+        if not isinstance(field_data, dict):
+            return ["字段数据必须是字典类型"]
+
+        errors = []
+        if not required_set <= field_data.keys():
+            errors.extend(f"缺少必填属性: {name}" for name in required if name not in field_data)
+        _check_properties(field_data, checks, errors)
+        return errors
+
+    return check
+
+
+def validate_batch(check: FieldCheck, fields: Dict[str, Any]) -> Dict[str, List[str]]:
+    """批量验证整个文件的字段，仅返回验证失败的字段及其错误"""
+    failures = {}
+    for field_name, field_data in fields.items():
+        errors = check(field_data)
+        if errors:
+            failures[field_name] = errors
+    return failures
@@ -2,249 +2,343 @@
 # -*- coding: utf-8 -*-
 """
 CORE-LNST.md 模块化拆分脚本
-自动将原始文档按照模块划分拆分为多个文件
+按拆分清单（split-manifest.yaml）将原始文档拆分为多个模块文件，
+并在同一遍中生成模块索引 docs/module-index.md 与机器可读的模块关系图 docs/module-graph.json
 """
 
+import argparse
+import hashlib
+import json
 import os
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
-def create_module_structure():
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from atomic_io import atomic_write_text
+from markdown_sections import MarkdownSection, MarkdownSections
+from yaml_io import load_yaml_file
+
+DEFAULT_MANIFEST = Path(__file__).resolve().parent / 'split-manifest.yaml'
+PLACEHOLDER_CONTENT = "# 待补充内容\n\n> 此模块内容需要从原始文档中提取"
+
+# 文档开头的 YAML 前言区
+FRONT_MATTER_PATTERN = re.compile(r'\A---[ \t]*\r?\n.*?^---[ \t]*\r?$', re.M | re.S)
+
+def load_manifest(manifest_path=DEFAULT_MANIFEST) -> Dict[str, Any]:
+    """加载拆分清单"""
+    manifest = load_yaml_file(manifest_path)
+    names = {group['name'] for group in manifest['groups']}
+    for group in manifest['groups']:
+        unknown = set(group.get('flows_to', ())) - names
+        if unknown:
+            raise ValueError(f"拆分清单中组 {group['id']} 的 flows_to 引用了不存在的组: {', '.join(sorted(unknown))}")
+        for module in group['modules']:
+            if module.get('sections') and not module.get('title'):
+                raise ValueError(f"拆分清单中模块 {module['file']} 有 sections 但缺少 title")
+    return manifest
+
+def module_path(manifest, group, module) -> str:
+    """模块文件路径（相对项目根目录）"""
+    return f"{manifest['modules_dir']}/{group['id']}/{module['file']}"
+
+def create_module_structure(manifest):
     """创建模块目录结构"""
     base_path = Path('.')
-    
+
     # 创建主要目录
-    directories = [
-        'modules/01-LNST',
-        'modules/02-HMNM', 
-        'modules/03-MAOS',
-        'modules/04-GSTR',
-        'modules/05-MATB',
-        'modules/06-Integration',
-        'modules/07-Implementation',
-        'modules/08-Reference',
-        'shared/templates',
-        'shared/schemas',
-        'docs'
-    ]
-    
+    directories = [f"{manifest['modules_dir']}/{group['id']}" for group in manifest['groups']]
+    directories.extend(manifest.get('directories', ()))
+
     for directory in directories:
         (base_path / directory).mkdir(parents=True, exist_ok=True)
         print(f"✅ 创建目录: {directory}")
 
-def split_content():
-    """拆分原始文档内容"""
-    
-    # 读取原始文档
-    with open('CORE-LNST.md', 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 定义章节映射
+def content_hash(data: bytes) -> str:
+    """内容哈希"""
+    return hashlib.sha256(data).hexdigest()
+
+def write_if_changed(file_path, content: str) -> bool:
+    """内容与现有文件不同时才（原子）写入，相同则不触碰文件、mtime 保持不变；返回是否写入"""
+    try:
+        with open(file_path, 'rb') as f:
+            if content_hash(f.read()) == content_hash(content.encode('utf-8')):
+                return False
+    except FileNotFoundError:
+        pass
+    atomic_write_text(file_path, content)
+    return True
+
+def write_module(sections, file_path, config, incremental=False) -> Dict[str, Any]:
+    """提取一个模块的内容并原子写入，返回模块记录（匹配到的源章节、内容哈希、是否写入）"""
+    section = find_module_section(sections, config['sections'])
+    module_content = sections.text(section).strip() if section else PLACEHOLDER_CONTENT
+
+    # 添加模块头部
+    full_content = f"{config['title']}\n\n{module_content}"
+
+    if incremental:
+        written = write_if_changed(file_path, full_content)
+    else:
+        atomic_write_text(file_path, full_content)
+        written = True
+    return {
+        'path': file_path,
+        'section': section,
+        'sha256': content_hash(full_content.encode('utf-8')),
+        'written': written
+    }
+
+def split_content(manifest, incremental=False, jobs=4) -> Dict[str, Any]:
+    """拆分原始文档内容；incremental 为 True 时只重写内容变化的模块
+
+    章节树只解析一次，由 jobs 个线程只读共享，各模块的提取与写入并发进行。
+    返回拆分结果：源文档哈希与各生成模块的记录（path、source_section、span、parent_module、sha256、written），
+    供 create_index_files 生成索引与关系图而无需再次解析源文档。
+    """
+
+    # 读取原始文档并一次性建立章节树
+    with open(manifest['source'], 'r', encoding='utf-8') as f:
+        source = f.read()
+    sections = MarkdownSections(source)
+
+    # 清单中带 sections 的模块由拆分生成
     section_mapping = {
-        # LNST模块
-        'modules/01-LNST/LNST-Overview.md': {
-            'title': '# LNST 精益创业概览',
-            'sections': ['## 1 LNST - 精益创业核心层']
-        },
-        'modules/01-LNST/LNST-Methodology.md': {
-            'title': '# LNST 精益创业方法论',
-            'sections': ['### 1.1 精益创业方法论集成']
-        },
-        'modules/01-LNST/LNST-Phases.md': {
-            'title': '# LNST 创业五阶段',
-            'sections': ['#### 1.1.2 创业五阶段价值链']
-        },
-        'modules/01-LNST/LNST-InvestorReadiness.md': {
-            'title': '# LNST 投资人就绪度框架',
-            'sections': ['### 1.2 投资人就绪度框架']
-        },
-        
-        # HMNM模块
-        'modules/02-HMNM/HMNM-Architecture.md': {
-            'title': '# HMNM 神经网络架构',
-            'sections': ['## 2 HMNM - 人机神经元体系层']
-        },
-        'modules/02-HMNM/HMNM-Documents.md': {
-            'title': '# HMNM 七份核心文档',
-            'sections': ['#### 2.1.1 七份核心文档架构']
-        },
-        
-        # MAOS模块
-        'modules/03-MAOS/MAOS-Architecture.md': {
-            'title': '# MAOS 智能体编排架构',
-            'sections': ['## 3 MAOS - 智能体编排系统层']
-        },
-        
-        # GSTR模块
-        'modules/04-GSTR/GSTR-Framework.md': {
-            'title': '# GSTR 四元融合体系',
-            'sections': ['## 4 GSTR - 目标-空间-时间-资本体系层']
-        },
-        
-        # MATB模块
-        'modules/05-MATB/MATB-ConversionEngine.md': {
-            'title': '# MATB 转换引擎',
-            'sections': ['## 5. MATB - Markdown-ASCII树形桥接层']
-        },
-        
-        # Integration模块
-        'modules/06-Integration/Integration-ValueFlow.md': {
-            'title': '# 五层价值流集成',
-            'sections': ['## 6 统筹中枢集成优化']
-        },
-        
-        # Implementation模块
-        'modules/07-Implementation/Implementation-Deployment.md': {
-            'title': '# 部署实施指南',
-            'sections': ['## 7 实施指南与监控']
-        },
-        
-        # Reference模块
-        'modules/08-Reference/Reference-Glossary.md': {
-            'title': '# 术语词典',
-            'sections': ['### 9.1 术语词典']
-        }
+        module_path(manifest, group, module): module
+        for group in manifest['groups']
+        for module in group['modules']
+        if module.get('sections')
     }
-    
+
     print("📝 开始拆分文档内容...")
-    
-    # 提取和保存各个模块
-    for file_path, config in section_mapping.items():
-        module_content = extract_section_content(content, config['sections'])
-        
-        # 添加模块头部
-        full_content = f"{config['title']}\n\n{module_content}"
-        
-        # 保存文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(full_content)
-        
-        print(f"✅ 创建模块: {file_path}")
-
-def extract_section_content(content, section_headers):
-    """提取指定章节的内容"""
-    # 这里简化处理，实际需要更复杂的解析逻辑
+
+    # 并发提取和保存各个模块（结果按清单顺序输出）
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        records = list(executor.map(lambda item: write_module(sections, item[0], item[1], incremental),
+                                    section_mapping.items()))
+    for record in records:
+        if record['written']:
+            print(f"✅ 创建模块: {record['path']}")
+        else:
+            print(f"⏭️  未变化: {record['path']}")
+
+    # 源章节相互嵌套时记录所属的上级模块
+    owners = {}
+    for record in records:
+        if record['section'] is not None:
+            owners.setdefault(id(record['section']), record['path'])
+    for record in records:
+        section = record.pop('section')
+        record['source_section'] = section.header if section else None
+        record['span'] = [section.start, section.end] if section else None
+        record['parent_module'] = None
+        parent = section.parent if section else None
+        while parent is not None:
+            if id(parent) in owners:
+                record['parent_module'] = owners[id(parent)]
+                break
+            parent = parent.parent
+
+    return {
+        'source': manifest['source'],
+        'source_sha256': content_hash(source.encode('utf-8')),
+        'modules': records
+    }
+
+def find_module_section(sections, section_headers) -> Optional[MarkdownSection]:
+    """按顺序查找第一个存在的章节"""
     for header in section_headers:
-        start_pos = content.find(header)
-        if start_pos != -1:
-            # 找到下一个同级标题作为结束位置
-            next_header_pos = find_next_header(content, start_pos + len(header))
-            if next_header_pos != -1:
-                return content[start_pos:next_header_pos].strip()
-            else:
-                return content[start_pos:].strip()
-    return "# 待补充内容\n\n> 此模块内容需要从原始文档中提取"
-
-def find_next_header(content, start_pos):
-    """查找下一个同级标题位置"""
-    lines = content[start_pos:].split('\n')
-    for i, line in enumerate(lines):
-        if line.startswith('## ') and not line.startswith('### '):
-            return start_pos + sum(len(l) + 1 for l in lines[:i])
-    return -1
-
-def create_index_files():
-    """创建索引文件"""
-    
-    # 创建模块索引
-    module_index = """
-# 模块索引
-
-## 核心模块
-
-### 01-LNST 精益创业核心层
-- [LNST-Overview.md](../modules/01-LNST/LNST-Overview.md) - 精益创业概览
-- [LNST-Methodology.md](../modules/01-LNST/LNST-Methodology.md) - 方法论与循环
-- [LNST-Phases.md](../modules/01-LNST/LNST-Phases.md) - 五阶段价值链
-- [LNST-InvestorReadiness.md](../modules/01-LNST/LNST-InvestorReadiness.md) - 投资人就绪度框架
-
-### 02-HMNM 人机神经元体系层
-- [HMNM-Architecture.md](../modules/02-HMNM/HMNM-Architecture.md) - 神经网络文档体系
-- [HMNM-Documents.md](../modules/02-HMNM/HMNM-Documents.md) - 七份核心文档
-- [HMNM-NeuralFlow.md](../modules/02-HMNM/HMNM-NeuralFlow.md) - 神经流优化
-- [HMNM-Collaboration.md](../modules/02-HMNM/HMNM-Collaboration.md) - 人机协作回路
-
-### 03-MAOS 智能体编排系统层
-- [MAOS-Architecture.md](../modules/03-MAOS/MAOS-Architecture.md) - 多智能体架构
-- [MAOS-Agents.md](../modules/03-MAOS/MAOS-Agents.md) - 六类核心智能体
-- [MAOS-Orchestration.md](../modules/03-MAOS/MAOS-Orchestration.md) - 编排机制
-- [MAOS-StartupIntegration.md](../modules/03-MAOS/MAOS-StartupIntegration.md) - 精益创业集成
-
-### 04-GSTR 四元体系层
-- [GSTR-Framework.md](../modules/04-GSTR/GSTR-Framework.md) - 四元融合体系
-- [GSTR-Dimensions.md](../modules/04-GSTR/GSTR-Dimensions.md) - 四维度架构
-- [GSTR-OODA.md](../modules/04-GSTR/GSTR-OODA.md) - OODA循环适配
-- [GSTR-Integration.md](../modules/04-GSTR/GSTR-Integration.md) - MAOS集成优化
-
-### 05-MATB 树形桥接层
-- [MATB-ConversionEngine.md](../modules/05-MATB/MATB-ConversionEngine.md) - 转换引擎
-- [MATB-SemanticMapping.md](../modules/05-MATB/MATB-SemanticMapping.md) - 语义映射
-- [MATB-AgentSyntax.md](../modules/05-MATB/MATB-AgentSyntax.md) - 智能体语法
-- [MATB-Visualization.md](../modules/05-MATB/MATB-Visualization.md) - 可视化输出
-
-## 集成与实施
-
-### 06-Integration 集成优化
-- [Integration-ValueFlow.md](../modules/06-Integration/Integration-ValueFlow.md) - 五层价值流集成
-- [Integration-TokenEconomy.md](../modules/06-Integration/Integration-TokenEconomy.md) - Token经济性优化
-- [Integration-MVPFlow.md](../modules/06-Integration/Integration-MVPFlow.md) - 24小时MVP流程
-- [Integration-Assessment.md](../modules/06-Integration/Integration-Assessment.md) - 投资人就绪度评估
-
-### 07-Implementation 实施指南
-- [Implementation-Deployment.md](../modules/07-Implementation/Implementation-Deployment.md) - 部署实施路径
-- [Implementation-Monitoring.md](../modules/07-Implementation/Implementation-Monitoring.md) - 监控与优化
-- [Implementation-RiskControl.md](../modules/07-Implementation/Implementation-RiskControl.md) - 风险控制
-- [Implementation-BestPractices.md](../modules/07-Implementation/Implementation-BestPractices.md) - 最佳实践
-
-### 08-Reference 参考资料
-- [Reference-Glossary.md](../modules/08-Reference/Reference-Glossary.md) - 术语词典
-- [Reference-Templates.md](../modules/08-Reference/Reference-Templates.md) - 配置模板
-- [Reference-Checklists.md](../modules/08-Reference/Reference-Checklists.md) - 快速参考卡片
-- [Reference-Cases.md](../modules/08-Reference/Reference-Cases.md) - 成功案例
-
-## 模块依赖关系
-
-```mermaid
-flowchart TD
-    A[LNST] --> B[HMNM]
-    A --> C[GSTR]
-    B --> D[MAOS]
-    C --> D
-    D --> E[MATB]
-    
-    F[Integration] --> A
-    F --> B
-    F --> C
-    F --> D
-    F --> E
-    
-    G[Implementation] --> F
-    H[Reference] --> G
-```
-"""
-    
-    with open('docs/module-index.md', 'w', encoding='utf-8') as f:
-        f.write(module_index)
-    
-    print("✅ 创建模块索引: docs/module-index.md")
+        section = sections.find(header)
+        if section is not None:
+            return section
+    return None
+
+def extract_section_content(sections, section_headers):
+    """提取指定章节的内容：章节到下一个同级或更高级标题为止（围栏代码块中的 # 行不视为标题）
+
+    sections 为 MarkdownSections（整篇文档只解析一次），也可直接传入文档文本
+    """
+    if isinstance(sections, str):
+        sections = MarkdownSections(sections)
+    section = find_module_section(sections, section_headers)
+    if section is not None:
+        return sections.text(section).strip()
+    return PLACEHOLDER_CONTENT
+
+def _document_title(file_path: Path) -> Optional[str]:
+    """文档的首个标题（跳过 YAML 前言区）"""
+    try:
+        content = file_path.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        return None
+    match = FRONT_MATTER_PATTERN.match(content)
+    sections = MarkdownSections(content[match.end():] if match else content)
+    return sections.sections[0].title if len(sections) else None
+
+def collect_modules(manifest) -> List[Dict[str, Any]]:
+    """清单中的模块，加上模块目录中实际存在但清单未列出的文档"""
+    modules = []
+    for group in manifest['groups']:
+        directory = Path(manifest['modules_dir']) / group['id']
+        declared = set()
+        for module in group['modules']:
+            declared.add(module['file'])
+            modules.append({
+                'path': module_path(manifest, group, module),
+                'group': group['id'],
+                'file': module['file'],
+                'description': module.get('description', ''),
+                'declared': True
+            })
+        extra = sorted(p for p in directory.glob('*.md') if p.name not in declared) if directory.is_dir() else []
+        for file_path in extra:
+            modules.append({
+                'path': f"{manifest['modules_dir']}/{group['id']}/{file_path.name}",
+                'group': group['id'],
+                'file': file_path.name,
+                'description': _document_title(file_path) or file_path.stem,
+                'declared': False
+            })
+    for module in modules:
+        module['exists'] = Path(module['path']).is_file()
+    return modules
+
+def render_module_index(manifest, modules) -> str:
+    """生成模块索引 Markdown"""
+    index_dir = Path(manifest['index']).parent
+    by_group: Dict[str, List[Dict[str, Any]]] = {}
+    for module in modules:
+        by_group.setdefault(module['group'], []).append(module)
+
+    lines = ["# 模块索引", ""]
+    for category in manifest['categories']:
+        lines.extend([f"## {category}", ""])
+        for group in manifest['groups']:
+            if group['category'] != category:
+                continue
+            lines.append(f"### {group['id']} {group['title']}")
+            for module in by_group.get(group['id'], ()):
+                link = os.path.relpath(module['path'], index_dir).replace(os.sep, '/')
+                lines.append(f"- [{module['file']}]({link}) - {module['description']}")
+            lines.append("")
+
+    lines.extend(["## 模块依赖关系", "", "```mermaid", "flowchart TD"])
+    for group in manifest['groups']:
+        for target in group.get('flows_to', ()):
+            lines.append(f"    {group['name']} --> {target}")
+    lines.extend(["```", ""])
+    return "\n".join(lines)
+
+def build_module_graph(manifest, modules, split_result=None) -> Dict[str, Any]:
+    """生成模块关系图（分组、模块及其源章节、组间依赖）"""
+    generated = {record['path']: record for record in (split_result or {}).get('modules', ())}
+    graph_modules = []
+    for module in modules:
+        record = generated.get(module['path'], {})
+        graph_modules.append({
+            'path': module['path'],
+            'group': module['group'],
+            'description': module['description'],
+            'declared': module['declared'],
+            'exists': module['exists'],
+            'generated': module['path'] in generated,
+            'source_section': record.get('source_section'),
+            'span': record.get('span'),
+            'parent_module': record.get('parent_module'),
+            'sha256': record.get('sha256')
+        })
+
+    return {
+        'source': manifest['source'],
+        'source_sha256': (split_result or {}).get('source_sha256'),
+        'groups': [
+            {
+                'id': group['id'],
+                'name': group['name'],
+                'title': group['title'],
+                'category': group['category'],
+                'directory': f"{manifest['modules_dir']}/{group['id']}",
+                'flows_to': list(group.get('flows_to', ()))
+            }
+            for group in manifest['groups']
+        ],
+        'modules': graph_modules,
+        'edges': [
+            {'from': group['name'], 'to': target}
+            for group in manifest['groups']
+            for target in group.get('flows_to', ())
+        ]
+    }
+
+def create_index_files(manifest, split_result=None, incremental=False) -> List[str]:
+    """创建模块索引与模块关系图；incremental 为 True 时内容未变化则不重写，返回实际写入的文件列表
+
+    split_result 为 split_content 的返回值，用于在关系图中记录各生成模块的源章节与内容哈希
+    """
+    modules = collect_modules(manifest)
+    outputs = {
+        manifest['index']: render_module_index(manifest, modules),
+        manifest['graph']: json.dumps(build_module_graph(manifest, modules, split_result),
+                                      ensure_ascii=False, indent=2) + "\n"
+    }
+
+    written = []
+    for file_path, content in outputs.items():
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        if incremental:
+            if not write_if_changed(file_path, content):
+                print(f"⏭️  未变化: {file_path}")
+                continue
+        else:
+            atomic_write_text(file_path, content)
+        written.append(file_path)
+        print(f"✅ 创建索引: {file_path}")
+    return written
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='CORE-LNST.md 模块化拆分')
+    parser.add_argument('--manifest', default=str(DEFAULT_MANIFEST),
+                        help='拆分清单路径（YAML）')
+    parser.add_argument('--incremental', action='store_true',
+                        help='可重复执行的增量模式：只重写内容变化的模块，保留原始文档不改名')
+    parser.add_argument('--jobs', '-j', type=int, default=4,
+                        help='并发提取与写入模块的线程数（1为串行）')
+    return parser.parse_args()
 
 def main():
     """主函数"""
-    print("🚀 开始执行CORE-LNST.md模块化方案...")
-    
+    args = parse_args()
+    manifest = load_manifest(args.manifest)
+    source = manifest['source']
+
+    if args.incremental:
+        print(f"🔄 增量拆分{source}...")
+        create_module_structure(manifest)
+        split_result = split_content(manifest, incremental=True, jobs=args.jobs)
+        written = [record['path'] for record in split_result['modules'] if record['written']]
+        written.extend(create_index_files(manifest, split_result, incremental=True))
+        print(f"\n🎉 增量拆分完成：{len(written)} 个文件更新")
+        return
+
+    print(f"🚀 开始执行{source}模块化方案...")
+
     # 1. 创建目录结构
-    create_module_structure()
-    
+    create_module_structure(manifest)
+
     # 2. 拆分文档内容
-    split_content()
-    
+    split_result = split_content(manifest, jobs=args.jobs)
+
     # 3. 创建索引文件
-    create_index_files()
-    
+    create_index_files(manifest, split_result)
+
     # 4. 备份原始文档
-    os.rename('CORE-LNST.md', 'CORE-LNST-LEGACY.md')
-    print("✅ 原始文档备份为: CORE-LNST-LEGACY.md")
-    
+    os.rename(source, manifest['legacy_source'])
+    print(f"✅ 原始文档备份为: {manifest['legacy_source']}")
+
     print("\n🎉 模块化方案执行完成！")
     print("\n📋 后续步骤:")
     print("1. 检查各模块文件内容")
@@ -253,4 +347,4 @@ def main():
     print("4. 测试模块集成")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享 YAML 读写层
+优先使用 libyaml 加速的 CSafeLoader/CSafeDumper，不可用时回退到纯 Python 实现
+"""
+
+from pathlib import Path
+from typing import Any, Union
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+    YAML_BACKEND = 'libyaml'
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+    YAML_BACKEND = 'pure-python'
+
+YAMLError = yaml.YAMLError
+
+# 字段池输出格式 - 合并结果与字段文件保持一致的序列化选项
+FIELDS_DUMP_OPTIONS = {
+    'allow_unicode': True,
+    'sort_keys': False,
+    'default_flow_style': False,
+    'indent': 2,
+    'width': 120
+}
+
+
+def safe_load(stream) -> Any:
+    """解析 YAML 文本或文件流"""
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def safe_dump(data: Any, stream=None, **kwargs):
+    """序列化为 YAML，参数与 yaml.dump 一致；stream 为 None 时返回字符串"""
+    return yaml.dump(data, stream, Dumper=SafeDumper, **kwargs)
+
+
+def load_yaml_file(file_path: Union[str, Path]) -> Any:
+    """读取并解析 YAML 文件"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return safe_load(f)
+
+
+def dump_yaml_file(data: Any, file_path: Union[str, Path], **kwargs):
+    """将数据序列化写入 YAML 文件"""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        safe_dump(data, f, **kwargs)
+
+
+if __name__ == '__main__':
+    print(f"YAML 后端: {YAML_BACKEND} (PyYAML {yaml.__version__})")
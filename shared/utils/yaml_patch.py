@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+YAML 字段文件追加补丁
+不解析整个文档，按行扫描建立 fields: 映射的轻量键索引，将新字段块以文本形式追加到映射末尾，
+原有内容（注释、顺序、格式）逐字节保持不变
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Set
+
+from yaml_io import safe_dump
+
+FIELDS_KEY = 'fields'
+DEFAULT_INDENT = 2
+
+# 块映射中的键行：缩进 + 键（可带引号，不含序列项 "- "）+ 冒号 + 空白或行尾
+KEY_LINE_PATTERN = re.compile(r'''^( *)("(?:[^"\\]|\\.)*"|'(?:[^']|'')*'|(?!-\s)[^\s#'"][^:#]*?)[ \t]*:(?:[ \t]|$)''')
+
+
+def _unquote(key: str) -> str:
+    if len(key) >= 2 and key[0] == key[-1] == '"':
+        return key[1:-1]
+    if len(key) >= 2 and key[0] == key[-1] == "'":
+        return key[1:-1].replace("''", "'")
+    return key
+
+
+def _is_content(line: str) -> bool:
+    stripped = line.strip()
+    return bool(stripped) and not stripped.startswith('#')
+
+
+class FieldsBlockIndex:
+    """fields: 映射的键索引与追加位置
+
+    supported 为 False 表示无法安全地文本追加（如 fields 为流式写法 `fields: {}`），调用方应回退为完整重写。
+    """
+
+    def __init__(self, text: str):
+        self.lines: List[str] = text.splitlines(keepends=True)
+        self.keys: Set[str] = set()
+        self.indent = DEFAULT_INDENT
+        self.block_start: Optional[int] = None  # fields: 所在行号（0起）
+        self.insert_at = len(self.lines)        # 新字段块插入的行号
+        self.supported = True
+        self._scan()
+
+    def _scan(self):
+        header = None
+        for number, line in enumerate(self.lines):
+            match = KEY_LINE_PATTERN.match(line)
+            if match and not match.group(1) and _unquote(match.group(2)) == FIELDS_KEY:
+                header = number
+                rest = line[match.end():].split('#', 1)[0].strip()
+                if rest:
+                    self.supported = False
+                    return
+                break
+
+        if header is None:
+            return
+        self.block_start = header
+
+        child_indent = None
+        last_content = header
+        for number in range(header + 1, len(self.lines)):
+            line = self.lines[number]
+            if not _is_content(line):
+                continue
+            indent = len(line) - len(line.lstrip(' '))
+            if indent == 0:
+                break
+            last_content = number
+            if child_indent is None:
+                child_indent = indent
+            if indent == child_indent:
+                match = KEY_LINE_PATTERN.match(line)
+                if match:
+                    self.keys.add(_unquote(match.group(2)))
+
+        self.indent = child_indent or DEFAULT_INDENT
+        self.insert_at = last_content + 1
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def render(self, fields: Dict[str, Any], **dump_options) -> str:
+        """将新字段渲染为缩进到 fields 映射下的 YAML 文本"""
+        text = safe_dump(fields, **dump_options)
+        prefix = ' ' * self.indent
+        return ''.join(prefix + line if line.strip() else line for line in text.splitlines(keepends=True))
+
+    def append(self, fields: Dict[str, Any], **dump_options):
+        """将新字段块插入到 fields 映射末尾（不检查重复，调用方先用 in 过滤），可多次调用"""
+        if self.lines and not self.lines[-1].endswith('\n'):
+            self.lines[-1] += '\n'
+
+        if self.block_start is None:
+            self.block_start = len(self.lines)
+            self.lines.append(f'{FIELDS_KEY}:\n')
+            self.insert_at = len(self.lines)
+
+        self.lines.insert(self.insert_at, self.render(fields, **dump_options))
+        self.insert_at += 1
+        self.keys.update(fields)
+
+    def text(self) -> str:
+        """返回当前完整文本"""
+        return ''.join(self.lines)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CRLF 文档的硬编码数值修复测试
+语料扫描与直接扫描得到的偏移都应能直接用于修复器改写，且原有 CRLF 换行保留
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+UTILS = ROOT / 'shared' / 'utils'
+sys.path.insert(0, str(UTILS))
+
+from corpus_reader import scan_corpus
+
+
+def load_script(name: str):
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), UTILS / f'{name}.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+FieldAutoFixer = load_script('field-auto-fixer').FieldAutoFixer
+
+CONTENT = '# 交付计划\r\n\r\n- 周期: 24小时\r\n- 目标: 80%达成\r\n- 预算: $5K\r\n'
+EXPECTED = ('# 交付计划\r\n\r\n'
+            '- 周期: {{dynamic_fields.TIME_BUDGET_24}}小时\r\n'
+            '- 目标: {{dynamic_fields.SUCCESS_THRESHOLD_80_}}达成\r\n'
+            '- 预算: ${{dynamic_fields.FINANCIAL_THRESHOLD_5K}}\r\n')
+
+
+@pytest.fixture
+def modules_dir(tmp_path):
+    modules = tmp_path / 'modules'
+    modules.mkdir()
+    (modules / 'plan.md').write_bytes(CONTENT.encode('utf-8'))
+    return modules
+
+
+@pytest.mark.parametrize('use_corpus', [False, True])
+def test_crlf_offsets_apply_in_place(tmp_path, modules_dir, use_corpus):
+    fixer = FieldAutoFixer(tmp_path / 'fields.yaml', modules_dir)
+    corpus = scan_corpus(modules_dir) if use_corpus else None
+    findings = fixer.scan_hardcoded_values(corpus)
+
+    plan = str(modules_dir / 'plan.md')
+    assert [finding['line_number'] for finding in findings[plan]] == [3, 4, 5]
+
+    results = fixer.apply_fixes(findings, dry_run=False)
+
+    assert results == {'files_processed': 1, 'replacements_made': 3}
+    assert (modules_dir / 'plan.md').read_bytes().decode('utf-8') == EXPECTED
+    assert (modules_dir / 'plan.md.backup').read_bytes() == CONTENT.encode('utf-8')
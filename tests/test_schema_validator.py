@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字段 Schema 编译器测试
+field_schema.json 编译出的检查比原先合并器手写的检查更严格，此处固定这一行为
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'shared' / 'utils'))
+sys.path.insert(0, str(ROOT / 'shared' / 'fields' / 'fields-s2run'))
+
+from schema_validator import compile_field_validator
+from merge_fields import AIFieldMerger
+
+BASE_FIELD = {
+    'zh-CN': '令牌预算',
+    'en-US': 'Token Budget',
+    'description': '单次任务的Token预算',
+    'type': 'token_budget',
+    'priority': 'P0',
+}
+
+
+@pytest.fixture(scope='module')
+def schema_check():
+    schema = json.loads((ROOT / 'shared' / 'fields' / 'field_schema.json').read_text(encoding='utf-8'))
+    return compile_field_validator(schema)
+
+
+@pytest.fixture(scope='module')
+def fallback_check():
+    return compile_field_validator(AIFieldMerger().default_field_schema())
+
+
+def with_changes(**changes):
+    field = dict(BASE_FIELD)
+    for key, value in changes.items():
+        key = key.replace('_', '-') if key == 'zh_CN' else key
+        if value is None:
+            field.pop(key, None)
+        else:
+            field[key] = value
+    return field
+
+
+def test_valid_field_passes(schema_check):
+    assert schema_check(BASE_FIELD) == []
+
+
+@pytest.mark.parametrize('field, message', [
+    (with_changes(priority=None), '缺少必填属性: priority'),
+    (with_changes(type='datetime'), '属性 type 取值无效: datetime'),
+    (with_changes(description=42), '属性 description 类型应为 string: 42'),
+    (with_changes(validation={'automation_level': 'sometimes'}), '属性 validation.automation_level 取值无效: sometimes'),
+    (with_changes(mvp_relevance={'is_mvp_critical': 'yes'}), '属性 mvp_relevance.is_mvp_critical 类型应为 boolean: yes'),
+])
+def test_schema_rejects_beyond_hand_written_rules(schema_check, fallback_check, field, message):
+    """以下字段原手写检查（即 Schema 缺失时的回退规则）接受，以 field_schema.json 编译后拒绝"""
+    assert message in schema_check(field)
+    assert fallback_check(field) == []
+
+
+@pytest.mark.parametrize('field', [
+    with_changes(zh_CN=None),
+    with_changes(priority='P9'),
+    with_changes(ai_collaboration='L5'),
+    with_changes(startup_phase='scaling'),
+    with_changes(value_chain_position='unknown'),
+    with_changes(token_budget={'estimated_tokens': 'many'}),
+])
+def test_hand_written_rules_still_enforced(schema_check, fallback_check, field):
+    assert schema_check(field)
+    assert fallback_check(field)
+
+
+def test_non_dict_field_rejected(schema_check):
+    assert schema_check('P0') == ["字段数据必须是字典类型"]